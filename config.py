@@ -25,17 +25,36 @@ class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     LLM_MODEL = "openai/gpt-oss-120b"
     LLM_TEMPERATURE = 2
+    SPECULATIVE_FALLBACK_SEARCH = False  # generate expanded/closest Cypher alongside the primary query
+    SPECULATIVE_FALLBACK_WORKERS = 4  # speculative fallback tiers running at once, across sessions
+    MULTI_TIER_CYPHER_GENERATION = False  # one LLM call returns primary, expanded and closest Cypher as JSON
+    QUERY_RESULT_CACHE_SIZE = 256  # recent (query, coordinates) results shared across sessions
+    QUERY_RESULT_CACHE_TTL = 300  # seconds; kept short because results depend on opening hours
+    COORDINATE_GRID_DECIMALS = 4  # query coordinates are snapped to ~11 m before caching and prompting
+    SERVICE_KEYWORD_CACHE_SIZE = 1024  # memoized keyword normalizations per QueryService
+    SCHEMA_CACHE_TTL = 300  # seconds before the graph schema used in Cypher prompts is re-read
+    TOKEN_ESTIMATE_ENCODING = "cl100k_base"  # tiktoken encoding used when the LLM reports no token usage
+    CATEGORIZATION_CACHE_SIZE = 256  # LLM service categorizations kept per detected-service combination
 
     # Google Sheets Configuration
     GOOGLE_CREDENTIALS = dict(st.secrets["google_credentials"])
     GOOGLE_SHEET_NAME = "DreamKGLogs"
     GOOGLE_WORKSHEET_NAME = "Session_Logs" 
+    GOOGLE_SHEETS_FLUSH_ROWS = 20  # max session uploads per append_rows request
+    GOOGLE_SHEETS_MAX_RETRIES = 5  # retries on 429/5xx before a batch is dropped
+    GOOGLE_SHEETS_COMPRESS_LOGS = False  # store logs as gzip+base64 (Complete_Log_Content_Gzb64)
+    GOOGLE_SHEETS_MAX_LOG_CHUNKS = 20  # max rows (one cell each) a single log is split across
     
     # Memory Configuration
     MAX_CONVERSATION_HISTORY = 5
     
     # Spatial Intelligence Configuration
     GEOCODING_TIMEOUT = 10
+    GEOCODE_CACHE_PATH = "./cache/geocoding_cache.sqlite3"  # None disables the on-disk cache
+    GEOCODE_CACHE_TTL = 30 * 24 * 60 * 60  # seconds
+    GEOCODING_MIN_INTERVAL = 1.0  # seconds between Nominatim requests (usage policy)
+    GEOCODING_MAX_WORKERS = 2  # concurrent lookups in geocode_locations
+    SPATIAL_PARSE_CACHE_SIZE = 1024  # memoized spatial parses per SpatialIntelligence
     DEFAULT_DISTANCE_THRESHOLD =  0.8 # miles
     EXPANDED_DISTANCE_THRESHOLD = 1.1  # miles
     
@@ -5,12 +5,67 @@ Tracks comprehensive statistics about queries, performance, usage patterns, and
 
 import logging
 import time
+from array import array
 from datetime import datetime
 from collections import defaultdict, Counter
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
 import json
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernel falls back to plain NumPy
+    njit = None
+
+# Section names accepted by MetricsCollector.format_statistics_report
+REPORT_SECTIONS = (
+    'session', 'queries', 'latency', 'tokens', 'processing',
+    'features', 'locations', 'categories', 'errors'
+)
+
+# Precomputed report headers (title line + underline) reused on every report
+_REPORT_BANNER = "=" * 60 + "\nENHANCED APPLICATION METRICS REPORT\n" + "=" * 60
+_H_QUERIES = "QUERY STATISTICS\n" + "-" * 16
+_H_LATENCY = "ENHANCED LATENCY METRICS\n" + "-" * 25
+_H_TOKENS = "ENHANCED TOKEN METRICS\n" + "-" * 22
+_H_PROCESSING = "PROCESSING TIME BREAKDOWN\n" + "-" * 27
+_H_FEATURES = "FEATURE USAGE\n" + "-" * 13
+_H_LOCATIONS = "TOP LOCATIONS\n" + "-" * 13
+_H_CATEGORIES = "QUERY CATEGORIES\n" + "-" * 16
+_H_ERRORS = "ERROR BREAKDOWN\n" + "-" * 15
+_SEP = ""
+
+# Percentiles reported for per-query latency distributions
+LATENCY_PERCENTILES = (50.0, 90.0, 99.0)
+
+
+def _percentile_values(values):
+    """
+    Compute LATENCY_PERCENTILES of a float64 latency column over one sorted copy.
+    
+    Args:
+        values (np.ndarray): Contiguous float64 latency values (non-empty)
+        
+    Returns:
+        np.ndarray: Percentiles using linear interpolation (same as np.percentile)
+    """
+    ordered = np.sort(values)
+    count = ordered.shape[0]
+    result = np.empty(len(LATENCY_PERCENTILES))
+    for i in range(len(LATENCY_PERCENTILES)):
+        rank = (count - 1) * LATENCY_PERCENTILES[i] / 100.0
+        lower = int(np.floor(rank))
+        upper = min(lower + 1, count - 1)
+        result[i] = ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+    return result
+
+
+if njit is not None:
+    # Compiled once and cached on disk so the JIT cost is not paid per session
+    _percentile_values = njit(cache=True)(_percentile_values)
+
 
 @dataclass
 class DetailedTokenMetrics:
@@ -126,6 +181,10 @@ class MetricsCollector:
         self.query_history: List[QueryMetrics] = []
         self.stats = SessionStats()
         
+        # Per-query latency columns (contiguous float64) for vectorized aggregation
+        self._total_latency_col = array('d')
+        self._llm_latency_col = array('d')
+        
         # Enhanced timing tracking
         self.current_query_start: float = 0.0
         self.current_internal_start: float = 0.0
@@ -146,8 +205,8 @@ class MetricsCollector:
         Returns:
             str: Query tracking ID
         """
-        self.current_query_start = time.time()
-        self.current_internal_start = time.time()
+        self.current_query_start = time.perf_counter()
+        self.current_internal_start = time.perf_counter()
         query_id = f"{self.session_id}_{len(self.query_history)}"
         
         self.current_query_data = {
@@ -174,12 +233,12 @@ class MetricsCollector:
     
     def start_llm_timing(self):
         """Start timing LLM API calls."""
-        self.current_llm_start = time.time()
+        self.current_llm_start = time.perf_counter()
         logging.info("METRICS: Starting LLM timing")
     
     def end_llm_timing(self):
         """End timing LLM API calls."""
-        self.current_llm_end = time.time()
+        self.current_llm_end = time.perf_counter()
         if self.current_llm_start > 0:
             llm_latency = self.current_llm_end - self.current_llm_start
             self.current_query_data['llm_latency'] = llm_latency
@@ -190,10 +249,10 @@ class MetricsCollector:
         Record time to first token.
         
         Args:
-            first_token_time (float): Time when first token was received, or None to use current time
+            first_token_time (float): time.perf_counter() value when the first token was received, or None to use now
         """
         if first_token_time is None:
-            first_token_time = time.time()
+            first_token_time = time.perf_counter()
         
         if self.current_llm_start > 0:
             ttft = first_token_time - self.current_llm_start
@@ -343,7 +402,7 @@ class MetricsCollector:
             return None
         
         # Calculate comprehensive latencies
-        end_time = time.time()
+        end_time = time.perf_counter()
         total_latency = end_time - self.current_query_data.get('start_time', end_time)
         
         # Calculate internal processing latency (total - LLM time)
@@ -440,8 +499,10 @@ class MetricsCollector:
         self.stats.total_internal_processing_latency += latency.internal_processing_latency
         self.stats.total_llm_api_latency += latency.llm_api_latency
         self.stats.total_local_processing_time += latency.local_processing_time
+        self._total_latency_col.append(latency.total_latency)
         
         if latency.llm_api_latency > 0:
+            self._llm_latency_col.append(latency.llm_api_latency)
             self.stats.min_llm_latency = min(self.stats.min_llm_latency, latency.llm_api_latency)
             self.stats.max_llm_latency = max(self.stats.max_llm_latency, latency.llm_api_latency)
         
@@ -525,6 +586,23 @@ class MetricsCollector:
         else:
             return 'other'
     
+    @staticmethod
+    def _latency_percentiles(column: array) -> Dict[str, str]:
+        """
+        Compute latency percentiles over a float64 column in a single vectorized pass.
+        
+        Args:
+            column (array): Per-query latency values in seconds
+            
+        Returns:
+            Dict: Formatted percentiles keyed as 'p50', 'p90', 'p99' ("N/A" when empty)
+        """
+        if not column:
+            return {f"p{p:.0f}": "N/A" for p in LATENCY_PERCENTILES}
+        
+        values = _percentile_values(np.frombuffer(column, dtype=np.float64))
+        return {f"p{p:.0f}": f"{value:.3f}s" for p, value in zip(LATENCY_PERCENTILES, values)}
+    
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get comprehensive statistics with enhanced token and latency metrics.
@@ -595,7 +673,8 @@ class MetricsCollector:
                     'average': f"{avg_total_latency:.3f}s",
                     'min': f"{self.stats.min_latency:.3f}s",
                     'max': f"{self.stats.max_latency:.3f}s",
-                    'total': f"{self.stats.total_latency:.3f}s"
+                    'total': f"{self.stats.total_latency:.3f}s",
+                    'percentiles': self._latency_percentiles(self._total_latency_col)
                 },
                 'internal_processing_latency': {
                     'average': f"{avg_internal_latency:.3f}s",
@@ -607,7 +686,8 @@ class MetricsCollector:
                     'min': f"{self.stats.min_llm_latency:.3f}s" if self.stats.min_llm_latency != float('inf') else "N/A",
                     'max': f"{self.stats.max_llm_latency:.3f}s",
                     'total': f"{self.stats.total_llm_api_latency:.3f}s",
-                    'percentage_of_total': f"{(avg_llm_latency / avg_total_latency * 100) if avg_total_latency > 0 else 0:.1f}%"
+                    'percentage_of_total': f"{(avg_llm_latency / avg_total_latency * 100) if avg_total_latency > 0 else 0:.1f}%",
+                    'percentiles': self._latency_percentiles(self._llm_latency_col)
                 },
                 'local_processing_time': {
                     'average': f"{avg_local_processing:.3f}s",
@@ -669,10 +749,13 @@ class MetricsCollector:
             'hourly_usage': dict(self.stats.hourly_usage)
         }
     
-    def format_statistics_report(self) -> str:
+    def format_statistics_report(self, sections=('all',)) -> str:
         """
         Generate a formatted statistics report with enhanced metrics.
         
+        Args:
+            sections (tuple): Section names from REPORT_SECTIONS to include, or ('all',)
+            
         Returns:
             str: Formatted report text with detailed token and latency metrics
         """
@@ -681,136 +764,219 @@ class MetricsCollector:
         if 'message' in stats:
             return stats['message']
         
-        report = []
-        report.append("="*60)
-        report.append("ENHANCED APPLICATION METRICS REPORT")
-        report.append("="*60)
-        
-        # Session info
-        session = stats['session_info']
-        report.append(f"Session ID: {session['session_id']}")
-        report.append(f"Duration: {session['duration']}")
-        report.append(f"Started: {session['start_time']}")
-        report.append("")
-        
-        # Query statistics
-        query_stats = stats['query_stats']
-        report.append("QUERY STATISTICS")
-        report.append("-" * 16)
-        report.append(f"Total Queries: {query_stats['total_queries']}")
-        report.append(f"Success Rate: {query_stats['success_rate']}")
-        report.append(f"Failed Queries: {query_stats['failed_queries']}")
-        report.append("")
-        
-        # Enhanced Latency Metrics
-        latency = stats['enhanced_latency_metrics']
-        report.append("ENHANCED LATENCY METRICS")
-        report.append("-" * 25)
-        report.append("Total Latency:")
-        report.append(f"  Average: {latency['total_latency']['average']}")
-        report.append(f"  Range: {latency['total_latency']['min']} - {latency['total_latency']['max']}")
-        report.append(f"  Total: {latency['total_latency']['total']}")
-        report.append("")
-        report.append("Internal Processing Latency:")
-        report.append(f"  Average: {latency['internal_processing_latency']['average']}")
-        report.append(f"  Total: {latency['internal_processing_latency']['total']}")
-        report.append(f"  % of Total: {latency['internal_processing_latency']['percentage_of_total']}")
-        report.append("")
-        report.append("LLM API Latency:")
-        report.append(f"  Average: {latency['llm_api_latency']['average']}")
-        report.append(f"  Range: {latency['llm_api_latency']['min']} - {latency['llm_api_latency']['max']}")
-        report.append(f"  Total: {latency['llm_api_latency']['total']}")
-        report.append(f"  % of Total: {latency['llm_api_latency']['percentage_of_total']}")
-        report.append("")
-        report.append("Time to First Token:")
-        report.append(f"  Average: {latency['time_to_first_token']['average']}")
-        report.append(f"  Total: {latency['time_to_first_token']['total']}")
-        report.append(f"  Queries with Data: {latency['time_to_first_token']['queries_with_data']}")
-        report.append("")
-        report.append("Local Processing Time:")
-        report.append(f"  Average: {latency['local_processing_time']['average']}")
-        report.append(f"  Total: {latency['local_processing_time']['total']}")
-        report.append("")
-        
-        # Enhanced Token Metrics
-        tokens = stats['enhanced_token_metrics']
-        report.append("ENHANCED TOKEN METRICS")
-        report.append("-" * 22)
-        report.append("Total Tokens:")
-        report.append(f"  Total: {tokens['total_tokens']['total']:,}")
-        report.append(f"  Average per Query: {tokens['total_tokens']['average_per_query']}")
-        report.append("")
-        report.append("Input Tokens:")
-        report.append(f"  Total: {tokens['input_tokens']['total']:,}")
-        report.append(f"  Average per Query: {tokens['input_tokens']['average_per_query']}")
-        report.append("")
-        report.append("Output Tokens:")
-        report.append(f"  Total: {tokens['output_tokens']['total']:,}")
-        report.append(f"  Average per Query: {tokens['output_tokens']['average_per_query']}")
-        report.append("")
-        report.append("Token Generation Rate:")
-        report.append(f"  Average: {tokens['token_generation_rate']['average']}")
-        report.append(f"  Total Generation Time: {tokens['token_generation_rate']['total_generation_time']}")
-        report.append("")
-        
-        # Processing Time Breakdown
-        processing = stats['processing_time_breakdown']
-        report.append("PROCESSING TIME BREAKDOWN")
-        report.append("-" * 27)
-        report.append("Neo4j Database Queries:")
-        report.append(f"  Average: {processing['neo4j_queries']['average']}")
-        report.append(f"  Total: {processing['neo4j_queries']['total']}")
-        report.append("")
-        report.append("Geocoding Operations:")
-        report.append(f"  Average: {processing['geocoding']['average']}")
-        report.append(f"  Total: {processing['geocoding']['total']}")
-        report.append("")
-        report.append("Spatial Processing:")
-        report.append(f"  Average: {processing['spatial_processing']['average']}")
-        report.append(f"  Total: {processing['spatial_processing']['total']}")
-        report.append("")
-        report.append("Memory Processing:")
-        report.append(f"  Average: {processing['memory_processing']['average']}")
-        report.append(f"  Total: {processing['memory_processing']['total']}")
-        report.append("")
-        
-        # Feature usage
-        features = stats['feature_usage']
-        report.append("FEATURE USAGE")
-        report.append("-" * 13)
-        report.append(f"Spatial Queries: {features['spatial_queries']}")
-        report.append(f"Memory Usage: {features['memory_usage']}")
-        report.append(f"Focused Queries: {features['focused_queries']}")
-        report.append(f"Geocoding Success: {features['geocoding_success']}")
-        report.append(f"Expanded Searches: {features['expanded_searches']}")
-        report.append(f"Zero Results: {features['zero_results']}")
-        report.append("")
-        
-        # Top locations
-        if stats['top_locations']:
-            report.append("TOP LOCATIONS")
-            report.append("-" * 13)
-            for location, count in stats['top_locations'].items():
-                report.append(f"  {location}: {count}")
-            report.append("")
-        
-        # Query categories
-        if stats['query_categories']:
-            report.append("QUERY CATEGORIES")
-            report.append("-" * 16)
-            for category, count in stats['query_categories'].items():
-                report.append(f"  {category}: {count}")
-            report.append("")
-        
-        # Error breakdown
-        if stats['error_breakdown']:
-            report.append("ERROR BREAKDOWN")
-            report.append("-" * 15)
-            for error_type, count in stats['error_breakdown'].items():
-                report.append(f"  {error_type}: {count}")
-            report.append("")
-        
-        return "\n".join(report)
+        include_all = 'all' in sections
+        builders = (
+            ('session', self._fmt_session, 'session_info'),
+            ('queries', self._fmt_query_stats, 'query_stats'),
+            ('latency', self._fmt_latency, 'enhanced_latency_metrics'),
+            ('tokens', self._fmt_tokens, 'enhanced_token_metrics'),
+            ('processing', self._fmt_processing, 'processing_time_breakdown'),
+            ('features', self._fmt_features, 'feature_usage'),
+            ('locations', self._fmt_top_locations, 'top_locations'),
+            ('categories', self._fmt_query_categories, 'query_categories'),
+            ('errors', self._fmt_error_breakdown, 'error_breakdown')
+        )
+        
+        parts = []
+        for name, builder, key in builders:
+            if include_all or name in sections:
+                section = builder(stats[key])
+                if section:
+                    parts.append(section)
+        
+        return "\n".join(parts)
+    
+    def _fmt_session(self, session: Dict[str, Any]) -> str:
+        """Format the report banner and session info section."""
+        return "\n".join([
+            _REPORT_BANNER,
+            f"Session ID: {session['session_id']}",
+            f"Duration: {session['duration']}",
+            f"Started: {session['start_time']}",
+            _SEP
+        ])
+    
+    def _fmt_query_stats(self, query_stats: Dict[str, Any]) -> str:
+        """Format the query statistics section."""
+        return "\n".join([
+            _H_QUERIES,
+            f"Total Queries: {query_stats['total_queries']}",
+            f"Success Rate: {query_stats['success_rate']}",
+            f"Failed Queries: {query_stats['failed_queries']}",
+            _SEP
+        ])
+    
+    def _fmt_latency(self, latency: Dict[str, Any]) -> str:
+        """Format the enhanced latency metrics section."""
+        total = latency['total_latency']
+        internal = latency['internal_processing_latency']
+        llm = latency['llm_api_latency']
+        ttft = latency['time_to_first_token']
+        local = latency['local_processing_time']
+        return "\n".join([
+            _H_LATENCY,
+            "Total Latency:",
+            f"  Average: {total['average']}",
+            f"  Range: {total['min']} - {total['max']}",
+            f"  Percentiles: p50 {total['percentiles']['p50']}, "
+            f"p90 {total['percentiles']['p90']}, "
+            f"p99 {total['percentiles']['p99']}",
+            f"  Total: {total['total']}",
+            _SEP,
+            "Internal Processing Latency:",
+            f"  Average: {internal['average']}",
+            f"  Total: {internal['total']}",
+            f"  % of Total: {internal['percentage_of_total']}",
+            _SEP,
+            "LLM API Latency:",
+            f"  Average: {llm['average']}",
+            f"  Range: {llm['min']} - {llm['max']}",
+            f"  Percentiles: p50 {llm['percentiles']['p50']}, "
+            f"p90 {llm['percentiles']['p90']}, "
+            f"p99 {llm['percentiles']['p99']}",
+            f"  Total: {llm['total']}",
+            f"  % of Total: {llm['percentage_of_total']}",
+            _SEP,
+            "Time to First Token:",
+            f"  Average: {ttft['average']}",
+            f"  Total: {ttft['total']}",
+            f"  Queries with Data: {ttft['queries_with_data']}",
+            _SEP,
+            "Local Processing Time:",
+            f"  Average: {local['average']}",
+            f"  Total: {local['total']}",
+            _SEP
+        ])
+    
+    def _fmt_tokens(self, tokens: Dict[str, Any]) -> str:
+        """Format the enhanced token metrics section."""
+        return "\n".join([
+            _H_TOKENS,
+            "Total Tokens:",
+            f"  Total: {tokens['total_tokens']['total']:,}",
+            f"  Average per Query: {tokens['total_tokens']['average_per_query']}",
+            _SEP,
+            "Input Tokens:",
+            f"  Total: {tokens['input_tokens']['total']:,}",
+            f"  Average per Query: {tokens['input_tokens']['average_per_query']}",
+            _SEP,
+            "Output Tokens:",
+            f"  Total: {tokens['output_tokens']['total']:,}",
+            f"  Average per Query: {tokens['output_tokens']['average_per_query']}",
+            _SEP,
+            "Token Generation Rate:",
+            f"  Average: {tokens['token_generation_rate']['average']}",
+            f"  Total Generation Time: {tokens['token_generation_rate']['total_generation_time']}",
+            _SEP
+        ])
+    
+    def _fmt_processing(self, processing: Dict[str, Any]) -> str:
+        """Format the processing time breakdown section."""
+        return "\n".join([
+            _H_PROCESSING,
+            "Neo4j Database Queries:",
+            f"  Average: {processing['neo4j_queries']['average']}",
+            f"  Total: {processing['neo4j_queries']['total']}",
+            _SEP,
+            "Geocoding Operations:",
+            f"  Average: {processing['geocoding']['average']}",
+            f"  Total: {processing['geocoding']['total']}",
+            _SEP,
+            "Spatial Processing:",
+            f"  Average: {processing['spatial_processing']['average']}",
+            f"  Total: {processing['spatial_processing']['total']}",
+            _SEP,
+            "Memory Processing:",
+            f"  Average: {processing['memory_processing']['average']}",
+            f"  Total: {processing['memory_processing']['total']}",
+            _SEP
+        ])
+    
+    def _fmt_features(self, features: Dict[str, Any]) -> str:
+        """Format the feature usage section."""
+        return "\n".join([
+            _H_FEATURES,
+            f"Spatial Queries: {features['spatial_queries']}",
+            f"Memory Usage: {features['memory_usage']}",
+            f"Focused Queries: {features['focused_queries']}",
+            f"Geocoding Success: {features['geocoding_success']}",
+            f"Expanded Searches: {features['expanded_searches']}",
+            f"Zero Results: {features['zero_results']}",
+            _SEP
+        ])
+    
+    def _fmt_top_locations(self, top_locations: Dict[str, int]) -> str:
+        """Format the top locations section (empty when no locations were requested)."""
+        if not top_locations:
+            return ""
+        lines = [_H_LOCATIONS]
+        lines.extend(f"  {location}: {count}" for location, count in top_locations.items())
+        lines.append(_SEP)
+        return "\n".join(lines)
+    
+    def _fmt_query_categories(self, query_categories: Dict[str, int]) -> str:
+        """Format the query categories section (empty when no queries were categorized)."""
+        if not query_categories:
+            return ""
+        lines = [_H_CATEGORIES]
+        lines.extend(f"  {category}: {count}" for category, count in query_categories.items())
+        lines.append(_SEP)
+        return "\n".join(lines)
+    
+    def _fmt_error_breakdown(self, error_breakdown: Dict[str, int]) -> str:
+        """Format the error breakdown section (empty when no errors occurred)."""
+        if not error_breakdown:
+            return ""
+        lines = [_H_ERRORS]
+        lines.extend(f"  {error_type}: {count}" for error_type, count in error_breakdown.items())
+        lines.append(_SEP)
+        return "\n".join(lines)
+    
+    def iter_query_records(self):
+        """
+        Yield per-query raw metrics one record at a time.
+        
+        Yields:
+            Dict: Raw metrics for a single query, including enhanced metrics
+        """
+        for q in self.query_history:
+            yield {
+                'timestamp': q.timestamp.isoformat(),
+                'query': q.query,
+                'success': q.success,
+                
+                # Enhanced latency metrics
+                'total_latency': q.latency_metrics.total_latency,
+                'internal_processing_latency': q.latency_metrics.internal_processing_latency,
+                'llm_api_latency': q.latency_metrics.llm_api_latency,
+                'local_processing_time': q.latency_metrics.local_processing_time,
+                'time_to_first_token': q.latency_metrics.time_to_first_token,
+                'token_generation_time': q.latency_metrics.token_generation_time,
+                
+                # Enhanced token metrics
+                'input_tokens': q.token_metrics.input_tokens,
+                'output_tokens': q.token_metrics.output_tokens,
+                'total_tokens': q.token_metrics.total_tokens,
+                'token_generation_rate': q.token_metrics.token_generation_rate,
+                'inter_token_arrival_time': q.token_metrics.inter_token_arrival_time,
+                
+                # Processing time breakdowns
+                'neo4j_query_time': q.neo4j_query_time,
+                'geocoding_time': q.geocoding_time,
+                'spatial_processing_time': q.spatial_processing_time,
+                'memory_processing_time': q.memory_processing_time,
+                
+                # Original fields
+                'is_spatial': q.is_spatial,
+                'used_memory': q.used_memory,
+                'is_focused': q.is_focused,
+                'result_count': q.result_count,
+                'geocoding_success': q.geocoding_success,
+                'expanded_search': q.expanded_search,
+                'location_text': q.location_text,
+                'distance_threshold': q.distance_threshold,
+                'error_message': q.error_message
+            }
     
     def export_raw_data(self) -> Dict[str, Any]:
         """
@@ -822,46 +988,7 @@ class MetricsCollector:
         return {
             'session_id': self.session_id,
             'session_start': self.session_start.isoformat(),
-            'query_history': [
-                {
-                    'timestamp': q.timestamp.isoformat(),
-                    'query': q.query,
-                    'success': q.success,
-                    
-                    # Enhanced latency metrics
-                    'total_latency': q.latency_metrics.total_latency,
-                    'internal_processing_latency': q.latency_metrics.internal_processing_latency,
-                    'llm_api_latency': q.latency_metrics.llm_api_latency,
-                    'local_processing_time': q.latency_metrics.local_processing_time,
-                    'time_to_first_token': q.latency_metrics.time_to_first_token,
-                    'token_generation_time': q.latency_metrics.token_generation_time,
-                    
-                    # Enhanced token metrics
-                    'input_tokens': q.token_metrics.input_tokens,
-                    'output_tokens': q.token_metrics.output_tokens,
-                    'total_tokens': q.token_metrics.total_tokens,
-                    'token_generation_rate': q.token_metrics.token_generation_rate,
-                    'inter_token_arrival_time': q.token_metrics.inter_token_arrival_time,
-                    
-                    # Processing time breakdowns
-                    'neo4j_query_time': q.neo4j_query_time,
-                    'geocoding_time': q.geocoding_time,
-                    'spatial_processing_time': q.spatial_processing_time,
-                    'memory_processing_time': q.memory_processing_time,
-                    
-                    # Original fields
-                    'is_spatial': q.is_spatial,
-                    'used_memory': q.used_memory,
-                    'is_focused': q.is_focused,
-                    'result_count': q.result_count,
-                    'geocoding_success': q.geocoding_success,
-                    'expanded_search': q.expanded_search,
-                    'location_text': q.location_text,
-                    'distance_threshold': q.distance_threshold,
-                    'error_message': q.error_message
-                }
-                for q in self.query_history
-            ],
+            'query_history': list(self.iter_query_records()),
             'session_stats': {
                 'total_queries': self.stats.total_queries,
                 'successful_queries': self.stats.successful_queries,
@@ -900,9 +1027,31 @@ class MetricsCollector:
             }
         }
     
-    def log_statistics_to_file(self):
-        """Log enhanced statistics to the log file."""
-        report = self.format_statistics_report()
+    def write_query_records(self, fp):
+        """
+        Stream per-query raw metrics to a text file as JSON Lines.
+        
+        Args:
+            fp: Writable text file object
+            
+        Returns:
+            int: Number of records written
+        """
+        count = 0
+        for record in self.iter_query_records():
+            fp.write(json.dumps(record))
+            fp.write("\n")
+            count += 1
+        return count
+    
+    def log_statistics_to_file(self, sections=('all',)):
+        """
+        Log enhanced statistics to the log file.
+        
+        Args:
+            sections (tuple): Report sections to include, or ('all',)
+        """
+        report = self.format_statistics_report(sections)
         logging.info(f"ENHANCED METRICS REPORT:\n{report}")
         
         # Also log raw stats for analysis
@@ -2,16 +2,207 @@
 
 import re
 import logging
-from datetime import datetime
+import functools
+from collections import deque
 from config import Config
 
 
+# Every pronoun, follow-up and detail-only pattern in should_use_memory needs one
+# of these words (or a '?'), so queries without them can skip those regexes
+_MEMORY_CUE_WORDS = frozenset({
+    'they', 'them', 'their', 'those', 'it', 'that', 'this',
+    'what', 'how', 'do', 'does', 'are', 'is', 'can', 'which', 'any',
+    'show', 'tell', 'when', 'phone', 'address', 'location'
+})
+_WORD_RE = re.compile(r'\w+')
+
+
+def _combine(patterns, flags=0):
+    """
+    Fuse a list of regex patterns into one compiled alternation.
+    
+    Args:
+        patterns (list): Pattern strings; each is wrapped in a non-capturing group
+        flags (int): re flags for the combined pattern
+        
+    Returns:
+        re.Pattern: Pattern that matches wherever any input pattern would
+    """
+    return re.compile("(?:" + ")|(?:".join(patterns) + ")", flags)
+
+
+# Shared subpatterns interpolated into the pattern lists below
+_DETAIL_WORDS = r'(?:hours|services|address|phone)'  # "...hours?" style follow-ups
+_DAY_SLOT = r'on \w+'                                # "...on Monday"
+
+# Explicit pronoun references to previous results: single-word pronouns are
+# matched against \w+ tokens (same as \bword\b), phrases by regex
+_PRONOUN_WORDS = frozenset({'they', 'them', 'their', 'those', 'it'})
+_PRONOUN_RE = _combine([
+    r'\bthat\s+(?:organization|place)\b', r'\bthis\s+(?:organization|place)\b'
+])
+
+# Follow-up question patterns: openers are tried with .match() so only the start
+# of the query is examined, then the unanchored suffix check runs
+_FOLLOWUP_PREFIX_RE = _combine([
+    r'what about|how about|do they|are they|can I|is there',
+    r'which ones|any of them|what are their',
+    r'show me their|tell me about their'
+])
+_FOLLOWUP_SUFFIX_RE = re.compile(rf'{_DETAIL_WORDS}\?$')
+
+# Questions about specific details that may not carry their own location (openers, used with .match())
+_DETAIL_PREFIX_RE = _combine([
+    r'what services|what are the hours|when are they open',
+    r'do any have|does anyone have|which have',
+    r'(?:phone number|address|location) for'
+])
+
+# Basic location detection (SpatialIntelligence is not imported to avoid a circular import)
+_LOCATION_RE = _combine([
+    r'\bnear\s+\w+', r'\bclose\s+to\s+\w+', r'\bin\s+\w+',
+    r'\bat\s+\w+', r'\baround\s+\w+', r'\bwithin\s+\d+'
+])
+
+# Simple follow-ups that can reuse cached results: openers (used with .match()) and unanchored suffixes
+_SIMPLE_FOLLOWUP_PREFIX_RE = _combine([
+    r'what are their|what about their|do they have|can I|tell me about their',
+    r'which ones|any of them|how many'
+])
+_SIMPLE_FOLLOWUP_SUFFIX_RE = _combine([
+    rf'{_DETAIL_WORDS}\?',
+    r'location\?'
+])
+
+# Literal text every simple follow-up pattern needs: a '?' or one of these openers
+_SIMPLE_FOLLOWUP_PREFIXES = ('what', 'do they', 'tell', 'which', 'any', 'how')
+
+# Focused follow-ups that should get a specific answer
+_FOCUSED_RE = _combine([
+    r'what are their.*(?:paid|free).*services',  # "what are their paid services?"
+    r'do they have.*(?:wifi|printing|computers)', # "do they have wifi?"
+    rf'what are their hours {_DAY_SLOT}',         # "what are their hours on Monday?"
+    rf'are they open {_DAY_SLOT}',                # "are they open on Sunday?"
+    r'what.*phone.*number',                      # "what's their phone number?"
+    r'what.*address',                            # "what's their address?"
+    r'when.*(?:open|close)',                     # "when do they open/close?"
+    r'how much.*(?:cost|price)',                 # "how much does printing cost?"
+])
+
+# Literal substrings at least one of which appears in every focused pattern
+_FOCUSED_ANCHORS = ('what', 'when', 'how much', 'do they have', 'are they open on')
+
+# Service-related topic keywords (matched as whole words). One frozenset probe per
+# token is already constant time; a generated perfect-hash table would only pay off
+# if this list grew to hundreds of keywords.
+_TOPIC_KEYWORDS = frozenset({
+    'printing', 'computers', 'wifi', 'internet', 'copying',
+    'books', 'study', 'meeting', 'programs', 'classes',
+    'hours', 'open', 'closed', 'schedule', 'time'
+})
+_TOPIC_TOKEN_RE = re.compile(r'[a-z]+')
+
+# Pronouns replaced by the previous organization list (single pass; the
+# "those <noun>" phrase is listed before bare "those" so it wins)
+_PRONOUN_SUBSTITUTION_RE = re.compile(
+    r'\b(?:they|them|those\s+(?:libraries|places|organizations)|those)\b', re.IGNORECASE
+)
+
+
+# Openers of an explicit new search; without a pronoun these never use memory
+_NEW_SEARCH_OPENER_RE = re.compile(r'(?:find|search|look for|i need|show me libraries|where can i find)\b')
+
+# Log wording for each memory-triggering follow-up cue
+_FOLLOWUP_REASONS = {
+    'pronoun': "Pronouns detected in query",
+    'followup': "Follow-up pattern detected",
+    'detail': "Detail-only query without new location"
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_followup(query_lower):
+    """
+    Classify the follow-up cue in a lowercased query (cached; depends only on the query).
+    
+    Args:
+        query_lower (str): Lowercased query
+        
+    Returns:
+        str: 'pronoun', 'followup' or 'detail' (key of _FOLLOWUP_REASONS),
+             'new' for an explicit new search, or None
+    """
+    tokens = _WORD_RE.findall(query_lower)
+    
+    # Cheap prefilter: without a cue word or '?' none of the patterns can match
+    if '?' not in query_lower and _MEMORY_CUE_WORDS.isdisjoint(tokens):
+        return 'new' if _NEW_SEARCH_OPENER_RE.match(query_lower) else None
+    
+    if not _PRONOUN_WORDS.isdisjoint(tokens) or _PRONOUN_RE.search(query_lower) is not None:
+        return 'pronoun'
+    
+    if _NEW_SEARCH_OPENER_RE.match(query_lower):
+        return 'new'
+    
+    if _FOLLOWUP_PREFIX_RE.match(query_lower) or _FOLLOWUP_SUFFIX_RE.search(query_lower):
+        return 'followup'
+    
+    # Asking about specific details without a new location context
+    if _DETAIL_PREFIX_RE.match(query_lower) and _LOCATION_RE.search(query_lower) is None:
+        return 'detail'
+    
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_simple(query_lower):
+    """
+    Check whether a lowercased query is a simple follow-up (cached).
+    
+    Args:
+        query_lower (str): Lowercased query
+        
+    Returns:
+        bool: True if simple follow-up
+    """
+    # Substring prefilter before touching the regex engine
+    if '?' not in query_lower and not query_lower.startswith(_SIMPLE_FOLLOWUP_PREFIXES):
+        return False
+    
+    return bool(_SIMPLE_FOLLOWUP_PREFIX_RE.match(query_lower) or _SIMPLE_FOLLOWUP_SUFFIX_RE.search(query_lower))
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_focused(query_lower):
+    """
+    Check whether a lowercased query is a focused follow-up (cached).
+    
+    Args:
+        query_lower (str): Lowercased query
+        
+    Returns:
+        bool: True if focused follow-up
+    """
+    # Substring prefilter before touching the regex engine
+    if not any(anchor in query_lower for anchor in _FOCUSED_ANCHORS):
+        return False
+    
+    return _FOCUSED_RE.search(query_lower) is not None
+
+
 class ConversationMemory:
     """
     Manages conversational memory and context for follow-up queries.
     Handles pronoun substitution, query continuity detection, and result caching.
+    Compiled patterns are module-level and shared by every instance.
     """
     
+    __slots__ = (
+        'max_history', 'conversation_history', 'current_context', 'last_query',
+        'last_organizations', 'last_spatial_info', '_last_orgs_joined', '_last_topics',
+        '_cached_context', '_new_query_cache'
+    )
+    
     def __init__(self, max_history=None):
         """
         Initialize conversation memory.
@@ -20,11 +211,15 @@ class ConversationMemory:
             max_history (int): Maximum number of interactions to store
         """
         self.max_history = max_history or Config.MAX_CONVERSATION_HISTORY
-        self.conversation_history = []  # List of interaction dictionaries
+        self.conversation_history = deque(maxlen=self.max_history)  # Interaction dictionaries, oldest evicted first
         self.current_context = None     # Current Neo4j results for reuse
         self.last_query = None         # Previous query for reference detection
         self.last_organizations = []   # Organization names from last result
         self.last_spatial_info = None  # Last spatial context
+        self._last_orgs_joined = ""    # ", "-joined last_organizations
+        self._last_topics = set()      # Topic keywords of last_query
+        self._cached_context = ""      # Formatted memory context for prompts
+        self._new_query_cache = set()  # Lowercased queries already judged independent of this context
         
         logging.info(f"ConversationMemory initialized with max_history={self.max_history}")
         
@@ -37,20 +232,22 @@ class ConversationMemory:
             results (list): Neo4j query results
             spatial_info (dict): Spatial context information
         """
-        # Extract organization names from results
-        organization_names = []
-        if results:
-            for result in results:
-                if isinstance(result, dict) and 'o.name' in result:
-                    organization_names.append(result['o.name'])
-        
-        # Store interaction
+        # Extract organization names from results ('o.name', then 'name', then 'organizationName')
+        get = dict.get
+        organization_names = [
+            name
+            for result in (results or ())
+            if isinstance(result, dict)
+            for name in (get(result, 'o.name') or get(result, 'name') or get(result, 'organizationName'),)
+            if name
+        ]
+        
+        # Store a lightweight summary; current_context keeps the only reference to the full results
         interaction = {
             'query': query,
-            'results': results,
+            'result_count': len(results) if results else 0,
             'organization_names': organization_names,
-            'spatial_info': spatial_info,
-            'timestamp': datetime.now()
+            'spatial_info': spatial_info
         }
         
         self.conversation_history.append(interaction)
@@ -58,10 +255,10 @@ class ConversationMemory:
         self.last_query = query
         self.last_organizations = organization_names
         self.last_spatial_info = spatial_info
-        
-        # Maintain history size
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history.pop(0)
+        self._last_orgs_joined = ", ".join(organization_names)
+        self._last_topics = self._extract_topics(query)
+        self._cached_context = self._build_memory_context()
+        self._new_query_cache.clear()
         
         logging.info(f"Memory updated: {len(organization_names)} organizations stored from query: '{query[:50]}...'")
     
@@ -81,74 +278,53 @@ class ConversationMemory:
         
         new_query_lower = new_query.lower()
         
-        # Check for explicit pronoun references
-        pronoun_patterns = [
-            r'\bthey\b', r'\bthem\b', r'\btheir\b', r'\bthose\b',
-            r'\bit\b', r'\bthat\s+(?:organization|place)\b', r'\bthis\s+(?:organization|place)\b'
-        ]
-        
-        has_pronouns = any(re.search(pattern, new_query_lower) for pattern in pronoun_patterns)
-        if has_pronouns:
-            logging.info(f"Memory decision: Pronouns detected in query: {new_query}")
-            return True
-        
-        # Check for follow-up question patterns
-        followup_patterns = [
-            r'^(?:what about|how about|do they|are they|can I|is there)',
-            r'^(?:which ones|any of them|what are their)',
-            r'^(?:show me their|tell me about their)',
-            r'hours\?$', r'services\?$', r'address\?$', r'phone\?$'
-        ]
-        
-        is_followup = any(re.search(pattern, new_query_lower) for pattern in followup_patterns)
-        if is_followup:
-            logging.info(f"Memory decision: Follow-up pattern detected: {new_query}")
-            return True
-        
-        # Check if asking about specific details without location context
-        detail_only_patterns = [
-            r'^(?:what services|what are the hours|when are they open)',
-            r'^(?:do any have|does anyone have|which have)',
-            r'^(?:phone number|address|location) for'
-        ]
+        # Negative cache: already judged independent for the current context
+        if new_query_lower in self._new_query_cache:
+            logging.info(f"Memory decision: New independent query (cached): {new_query}")
+            return False
         
-        is_detail_query = any(re.search(pattern, new_query_lower) for pattern in detail_only_patterns)
-        if is_detail_query and not self._has_new_location_context(new_query):
-            logging.info(f"Memory decision: Detail-only query without new location: {new_query}")
+        # Pronoun, follow-up or detail-only cue
+        reason = _classify_followup(new_query_lower)
+        if reason == 'new':
+            logging.info(f"Memory decision: Explicit new search: {new_query}")
+            self._new_query_cache.add(new_query_lower)
+            return False
+        if reason:
+            logging.info(f"Memory decision: {_FOLLOWUP_REASONS[reason]}: {new_query}")
             return True
         
         # Check for topic continuity (same service/topic, no new location)
-        if self._has_topic_continuity(new_query) and not self._has_new_location_context(new_query):
+        if (self._has_topic_continuity(new_query, new_query_lower)
+                and not self._has_new_location_context(new_query, new_query_lower)):
             logging.info(f"Memory decision: Topic continuity detected: {new_query}")
             return True
         
         logging.info(f"Memory decision: New independent query: {new_query}")
+        self._new_query_cache.add(new_query_lower)
         return False
     
-    def _has_new_location_context(self, query):
+    def _has_new_location_context(self, query, query_lower=None):
         """
         Check if query introduces a new location context.
         
         Args:
             query (str): Query to check for location context
+            query_lower (str): Pre-lowercased query, computed from query if omitted
             
         Returns:
             bool: True if new location context detected
         """
-        # Import spatial intelligence to reuse location detection
-        # Note: This creates a circular import issue, so we'll use basic detection
-        location_patterns = [
-            r'\bnear\s+\w+', r'\bclose\s+to\s+\w+', r'\bin\s+\w+',
-            r'\bat\s+\w+', r'\baround\s+\w+', r'\bwithin\s+\d+'
-        ]
-        return any(re.search(pattern, query.lower()) for pattern in location_patterns)
+        if query_lower is None:
+            query_lower = query.lower()
+        return _LOCATION_RE.search(query_lower) is not None
     
-    def _has_topic_continuity(self, new_query):
+    def _has_topic_continuity(self, new_query, new_query_lower=None):
         """
         Check if new query continues the same topic as previous query.
         
         Args:
             new_query (str): New query to check for topic continuity
+            new_query_lower (str): Pre-lowercased new query, computed if omitted
             
         Returns:
             bool: True if topics overlap
@@ -156,38 +332,22 @@ class ConversationMemory:
         if not self.last_query:
             return False
         
-        # Extract key topics from both queries
-        current_topics = self._extract_topics(self.last_query)
-        new_topics = self._extract_topics(new_query)
-        
-        # Check for overlap
-        return bool(current_topics.intersection(new_topics))
+        return bool(self._last_topics & self._extract_topics(new_query, new_query_lower))
     
-    def _extract_topics(self, query):
+    def _extract_topics(self, query, query_lower=None):
         """
         Extract key topics/services from a query.
         
         Args:
             query (str): Query to extract topics from
+            query_lower (str): Pre-lowercased query, computed from query if omitted
             
         Returns:
             set: Set of topic keywords found in query
         """
-        query_lower = query.lower()
-        topics = set()
-        
-        # Service-related topics
-        service_keywords = [
-            'printing', 'computers', 'wifi', 'internet', 'copying',
-            'books', 'study', 'meeting', 'programs', 'classes',
-            'hours', 'open', 'closed', 'schedule', 'time'
-        ]
-        
-        for keyword in service_keywords:
-            if keyword in query_lower:
-                topics.add(keyword)
-        
-        return topics
+        if query_lower is None:
+            query_lower = query.lower()
+        return set(_TOPIC_TOKEN_RE.findall(query_lower)) & _TOPIC_KEYWORDS
     
     def get_memory_context(self):
         """
@@ -196,19 +356,31 @@ class ConversationMemory:
         Returns:
             str: Formatted memory context string
         """
+        return self._cached_context
+    
+    def _build_memory_context(self):
+        """
+        Build the formatted memory context from the current interaction state.
+        
+        Returns:
+            str: Formatted memory context string, empty when nothing is stored
+        """
         if not self.current_context or not self.last_organizations:
             return ""
         
-        context = f"\nMEMORY CONTEXT:\n"
-        context += f"Previous Query: {self.last_query}\n"
-        context += f"Organizations from Previous Results: {', '.join(self.last_organizations)}\n"
+        parts = [
+            "\nMEMORY CONTEXT:\n",
+            f"Previous Query: {self.last_query}\n",
+            f"Organizations from Previous Results: {self._last_orgs_joined}\n"
+        ]
         
         if self.last_spatial_info:
-            context += f"Previous Spatial Context: User was asking about location near {self.last_spatial_info.get('location_text', 'unknown')}\n"
+            location_text = self.last_spatial_info.get('location_text', 'unknown')
+            parts.append(f"Previous Spatial Context: User was asking about location near {location_text}\n")
         
-        context += f"Available Previous Results: {len(self.current_context)} organizations with full details\n"
+        parts.append(f"Available Previous Results: {len(self.current_context)} organizations with full details\n")
         
-        return context
+        return "".join(parts)
     
     def substitute_pronouns(self, query):
         """
@@ -223,19 +395,8 @@ class ConversationMemory:
         if not self.last_organizations:
             return query
         
-        substituted_query = query
-        organization_list = ", ".join(self.last_organizations)
-        
-        # Pronoun substitution patterns
-        substitutions = [
-            (r'\bthey\b', organization_list),
-            (r'\bthem\b', organization_list),
-            (r'\bthose\s+(?:libraries|places|organizations)\b', organization_list),
-            (r'\bthose\b', organization_list)
-        ]
-        
-        for pattern, replacement in substitutions:
-            substituted_query = re.sub(pattern, replacement, substituted_query, flags=re.IGNORECASE)
+        organization_list = self._last_orgs_joined
+        substituted_query = _PRONOUN_SUBSTITUTION_RE.sub(lambda match: organization_list, query)
         
         if substituted_query != query:
             logging.info(f"Pronoun substitution: '{query}' -> '{substituted_query}'")
@@ -244,11 +405,15 @@ class ConversationMemory:
     
     def clear_memory(self):
         """Clear all memory."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.current_context = None
         self.last_query = None
         self.last_organizations = []
         self.last_spatial_info = None
+        self._last_orgs_joined = ""
+        self._last_topics = set()
+        self._cached_context = ""
+        self._new_query_cache.clear()
         logging.info("Memory cleared")
     
     def is_simple_followup(self, query):
@@ -261,19 +426,7 @@ class ConversationMemory:
         Returns:
             bool: True if simple follow-up
         """
-        query_lower = query.lower()
-        
-        simple_followup_patterns = [
-            r'^(?:what are their|what about their|do they have|can I|tell me about their)',
-            r'^(?:which ones|any of them|how many)',
-            r'hours\?',
-            r'services\?',
-            r'address\?',
-            r'phone\?',
-            r'location\?'
-        ]
-        
-        return any(re.search(pattern, query_lower) for pattern in simple_followup_patterns)
+        return _classify_simple(query.lower())
     
     def is_focused_followup(self, query):
         """
@@ -285,20 +438,7 @@ class ConversationMemory:
         Returns:
             bool: True if focused follow-up
         """
-        query_lower = query.lower()
-        
-        focused_patterns = [
-            r'what are their.*(?:paid|free).*services',  # "what are their paid services?"
-            r'do they have.*(?:wifi|printing|computers)', # "do they have wifi?"
-            r'what are their hours on \w+',              # "what are their hours on Monday?"
-            r'are they open on \w+',                     # "are they open on Sunday?"
-            r'what.*phone.*number',                      # "what's their phone number?"
-            r'what.*address',                            # "what's their address?"
-            r'when.*(?:open|close)',                     # "when do they open/close?"
-            r'how much.*(?:cost|price)',                 # "how much does printing cost?"
-        ]
-        
-        return any(re.search(pattern, query_lower) for pattern in focused_patterns)
+        return _classify_focused(query.lower())
     
     def get_interaction_count(self):
         """
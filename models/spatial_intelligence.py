@@ -1,12 +1,275 @@
 
 
+import os
 import re
+import time
+import sqlite3
 import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 from geopy.geocoders import Nominatim
+from geopy.adapters import RequestsAdapter
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 from config import Config
 
 
+def _combine(patterns):
+    """Compile a list of patterns into a single alternation, one search per list."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+# Spatial query detection patterns, compiled once at import time
+
+# Prefilter: every detection pattern below (landmarks aside) needs one of these
+# fragments, so a query matching none of them cannot be spatial
+# Whitespace followed by the start of a street suffix; every street pattern needs it
+_STREET_HINT = r'\s(?:st|ave|road|rd|blvd|boulevard)'
+_STREET_HINT_RE = re.compile(_STREET_HINT)
+
+_SPATIAL_PREFILTER_RE = re.compile(
+    r'near|close|within|mile|km|block|walking|driving|around|vicinity|area|location'
+    r'|19\d{3}'                                     # zip codes
+    r'|\b(?:in|at|on)\s'                            # location prepositions
+    rf'|{_STREET_HINT}'                             # street suffixes
+)
+
+_EXPLICIT_SPATIAL_RE = _combine((
+    r'\bnear\s+[a-zA-Z]',           # "near City Hall" (not "near 8pm")
+    r'\bclose\s+to\s+[a-zA-Z]',     # "close to Temple"
+    r'\bwithin\s+\d+.*(?:mile|km|block)', # "within 2 miles"
+    r'\b\d+\s*(?:mile|km|block)s?\s+(?:of|from)', # "2 miles from"
+    r'\b(?:walking|driving)\s+distance', # "walking distance"
+))
+
+_ADDRESS_RE = _combine((
+    # Numbered addresses: "123 Main Street"
+    r'\d+\s+\w+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard)',
+    # Street names without numbers: "North Broad Street", "Market Street", etc.
+    r'(?:north|south|east|west)\s+\w+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard)',
+    r'\w+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard)(?:\s|$|,|\.)',
+    # Zip codes
+    r'\b19\d{3}\b',
+))
+
+# Time-related words that should NOT trigger spatial detection. Location
+# candidates are runs of letters separated by whitespace, so a whole-word
+# match is exactly a token lookup in this set.
+_TIME_WORDS = frozenset({
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+    'weekday', 'weekend', 'morning', 'afternoon', 'evening', 'night',
+    'today', 'tomorrow', 'yesterday', 'weekdays', 'weekends',
+    'am', 'pm', 'oclock', "o'clock"
+})
+
+# "in Philadelphia" / "on North Broad Street" but not "in the morning",
+# "at Temple" but not "at 8pm"
+_LOCATION_PREPOSITION_RE = re.compile(
+    r'\b(?:(?P<prep>in|on)\s+(?!the\s+)(?!a\s+)|(?P<at>at)\s+)'
+    r'(?!\d)(?P<loc>[a-zA-Z]++(?:\s++[a-zA-Z]++)*)'
+)
+
+# "around 8pm", "around 8:30am", "around 8 o'clock"
+_AROUND_TIME_RE = re.compile(r'around\s+\d+\s*(am|pm|:\d+|o\'?clock)')
+_AROUND_LOCATION_RE = re.compile(r'\baround\s+(?!the\s+)(?!\d)([a-zA-Z]++(?:\s++[a-zA-Z]++)*)')  # "around Temple" but not "around 8pm"
+_OTHER_TIME_CONTEXT_RE = _combine((
+    r'open\s+around',                # "open around"
+    r'close\s+around',               # "close around"
+    r'hours.*around',                # "hours around"
+))
+
+_REMAINING_SPATIAL_KEYWORDS = ('closest', 'nearest', 'vicinity', 'area', 'location')
+
+# Location extraction patterns, in priority order. Word runs use possessive
+# quantifiers (Python 3.11+): a letter run is always followed by whitespace or
+# a non-letter, so giving characters back can never produce a match and only
+# costs backtracking. Trailing context is a lookahead since only group 1 is used.
+_ZIP_RE = re.compile(r'\b(19\d{3})\b')
+
+_LANDMARK_RES = tuple(re.compile(p) for p in (
+    # Pattern for "near the [Multi-word Landmark]"
+    r'near\s+the\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){1,4})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'close\s+to\s+the\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){1,4})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'at\s+the\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){1,4})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'around\s+the\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){1,4})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    # Pattern for "near [Multi-word Landmark without 'the']"
+    r'near\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){1,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'close\s+to\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){1,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+))
+
+# Numbered and directional streets in one scan; the named group that matched
+# (match.lastgroup) selects the validation for the candidate
+_STREET_SUFFIX = r'(?:street|st|avenue|ave|road|rd|blvd|boulevard)'
+_STREET_RE = re.compile(
+    # "North 5th Street"
+    rf'\b(?P<numbered_directional>(?:north|south|east|west)\s+\d+(?:st|nd|rd|th)?\s+{_STREET_SUFFIX})\b'
+    # "1500 Market Street"
+    rf'|\b(?P<numbered>\d{{1,5}}\s++[a-zA-Z]++(?:\s++[a-zA-Z]++){{0,2}}\s+{_STREET_SUFFIX})\b'
+    # "North Broad Street", "West Girard Avenue" (one-word street names tried first)
+    rf'|\b(?P<directional>(?:north|south|east|west)\s++[a-zA-Z]++(?:\s++[a-zA-Z]++)??\s+{_STREET_SUFFIX})\b'
+)
+
+# Street patterns with prepositions
+_PREPOSITION_RES = tuple(re.compile(p) for p in (
+    r'near\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
+    r'close\s+to\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
+    r'on\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s+(?:on|at|in)\b|\s*$)',
+    r'at\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
+    r'in\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
+))
+
+_SIMPLE_LOCATION_RES = tuple(re.compile(p) for p in (
+    r'near\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'close\s+to\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'at\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+    r'in\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
+))
+
+# "around" variants only apply when the query does not use "around" for a
+# time ("around 8pm"), so both pattern sets are prebuilt
+_PREPOSITION_WITH_AROUND_RES = _PREPOSITION_RES + (
+    re.compile(r'around\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)'),
+)
+_SIMPLE_LOCATION_WITH_AROUND_RES = _SIMPLE_LOCATION_RES + (
+    re.compile(r'around\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,3})(?=\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)'),
+)
+
+_HAS_LETTER_RE = re.compile(r'[a-zA-Z]')
+
+_DISTANCE_LOCATION_RES = tuple(re.compile(p) for p in (
+    r'within\s+\d+(?:\.\d+)?\s+(?:miles?|mi|km|blocks?)\s+of\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,4})(?=\s+(?:has|have|with|on|at|in)\b|\s*$)',
+    r'\d+\s*(?:miles?|mi|km|blocks?)\s+(?:of|from)\s+([a-zA-Z]++(?:\s++[a-zA-Z]++){0,4})(?=\s+(?:has|have|with|on|at|in)\b|\s*$)',
+))
+
+_DISTANCE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(miles?|mi|km|blocks?)')
+_MILES_PER_UNIT = {
+    'mile': 1, 'miles': 1, 'mi': 1,
+    'km': 0.621371,  # Convert km to miles
+    'block': 0.1, 'blocks': 0.1,  # Assume 10 blocks per mile
+}
+
+_DEFAULT_STOP_WORDS = ('has', 'have', 'with', 'on', 'at', 'in', 'is', 'are', 'handles', 'handle')
+
+
+def _trailing_stop_re(stop_words):
+    """Compile a right-anchored pattern for a run of trailing stop words in single-spaced text."""
+    words = '|'.join(map(re.escape, stop_words))
+    return re.compile(rf'(?:^| )(?:{words})(?: (?:{words}))*$', re.IGNORECASE)
+
+
+_TRAILING_STOP_RE = _trailing_stop_re(_DEFAULT_STOP_WORDS)
+
+
+def _literal_alternation(literals):
+    """
+    Compile literal strings into one alternation regex for a single-pass scan.
+    
+    Longer literals are tried first, so a search returns the leftmost match and,
+    among literals starting there, the longest one.
+    
+    Args:
+        literals (iterable): Literal strings to match
+        
+    Returns:
+        re.Pattern: Compiled alternation (never matches when literals is empty)
+    """
+    ordered = sorted(literals, key=len, reverse=True)
+    if not ordered:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(map(re.escape, ordered)))
+
+
+def _priority_scan_re(literals):
+    """
+    Compile literals, in priority order, into a lookahead scan for re.findall.
+    
+    At every position the first literal (in the given order) that starts there
+    is reported, so the highest-priority literal present in the text is always
+    among the findall results.
+    
+    Args:
+        literals (iterable): Literal strings in priority order
+        
+    Returns:
+        re.Pattern: Compiled scan (never matches when literals is empty)
+    """
+    ordered = list(literals)
+    if not ordered:
+        return re.compile(r'(?!)')
+    return re.compile('(?=(' + '|'.join(map(re.escape, ordered)) + '))')
+
+
+def _words_re(words):
+    """Compile a list of excluded words into one whole-word alternation."""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + r')\b')
+
+
+# Excluded-word lists used to reject captured location candidates
+_SERVICE_WORDS_RE = _words_re(
+    ['story', 'time', 'toddler', 'program', 'class', 'service', 'form', 'tax', 'application']
+)
+_FORM_RELATED_WORDS_RE = _words_re(
+    ['form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document']
+)
+_DIRECTIONAL_EXCLUDED_WORDS_RE = _words_re(
+    ['story', 'time', 'toddler', 'has', 'have', 'with', 'program', 'class', 'service']
+)
+_NON_LOCATION_WORDS_RE = _words_re([
+    'form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document', 'paper',
+    'apply', 'retirement', 'benefits', 'where', 'can',
+    'story', 'time', 'toddler', 'program', 'class', 'service'
+])
+# Street kind -> (excluded words, log label) for _STREET_RE candidates
+_STREET_KINDS = {
+    'numbered_directional': (None, "numbered directional street"),
+    'numbered': (_FORM_RELATED_WORDS_RE, "numbered address from query"),
+    'directional': (_DIRECTIONAL_EXCLUDED_WORDS_RE, "directional street from query"),
+}
+# NOTE: 'the' is deliberately not excluded to allow "Philadelphia Museum" etc.
+_SIMPLE_NON_LOCATION_WORDS_RE = _words_re([
+    'form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document', 'paper',
+    'apply', 'retirement', 'benefits', 'where', 'can',
+    'wednesday', 'monday', 'tuesday', 'thursday', 'friday', 'saturday', 'sunday',
+    'story', 'time', 'toddler', 'program', 'class', 'service'
+])
+
+
+# Candidate validation helpers, defined once at module level rather than as
+# closures rebuilt on every extraction call
+def _contains_excluded_words(text, excluded_words_re):
+    """Check if text contains any excluded words using word boundaries."""
+    # One pass over the text with the list's precompiled whole-word alternation
+    match = excluded_words_re.search(text.lower())
+    if match:
+        logging.info(f"Found excluded word '{match.group(0)}' in '{text}'")
+        return True
+    return False
+
+
+def _extract_clean_location(text, trailing_stop_re=_TRAILING_STOP_RE):
+    """Extract clean location by removing stop words at the end."""
+    # Collapse whitespace, then drop the trailing stop-word run in one anchored pass
+    clean = trailing_stop_re.sub('', ' '.join(text.split()))
+    return clean or text
+
+
+@dataclass(frozen=True, slots=True)
+class SpatialAnalysis:
+    """Data class for the spatial reading of a single query."""
+    is_spatial: bool
+    location: Optional[str] = None  # Only extracted for spatial queries
+    distance_threshold: Optional[float] = None  # miles; only set for spatial queries
+    landmark: Optional[str] = None  # Philadelphia landmark named in the query, if any
+
+
+# On-disk geocoding cache connections by path, shared by every session's SpatialIntelligence
+_GEOCODE_STORES = {}
+# Guards opening the shared connections and every statement run on them
+_GEOCODE_STORE_LOCK = threading.Lock()
+
+
 class SpatialIntelligence:
     """
     Handles all spatial intelligence operations including:
@@ -20,12 +283,36 @@ class SpatialIntelligence:
         """Initialize spatial intelligence with geocoder and configuration."""
         self.geolocator = Nominatim(
             user_agent="organization_finder_app", 
-            timeout=Config.GEOCODING_TIMEOUT
+            timeout=Config.GEOCODING_TIMEOUT,
+            # Keep-alive session: reuse the HTTPS connection across geocode calls
+            adapter_factory=RequestsAdapter
         )
         self.geocoding_cache = {}
+        self._geocode_store = self._open_geocode_store(Config.GEOCODE_CACHE_PATH)
+        self._geocode_store_lock = _GEOCODE_STORE_LOCK
+        # Nominatim allows about one request per second; batch lookups share this slot
+        self._request_lock = threading.Lock()
+        self._next_request_at = 0.0
         self.spatial_keywords = Config.SPATIAL_KEYWORDS
         self.proximity_thresholds = Config.PROXIMITY_THRESHOLDS
         self.philly_landmarks = Config.PHILLY_LANDMARKS
+        self._landmark_re = _literal_alternation(self.philly_landmarks)
+        # Proximity terms keep their config order as priority: the lookahead scan
+        # reports the highest-priority term starting at each position
+        self._proximity_re = _priority_scan_re(self.proximity_thresholds)
+        self._proximity_rank = {term: rank for rank, term in enumerate(self.proximity_thresholds)}
+        # Landmark coordinates are static config, so parse the "lat, lon" strings once
+        self._philly_landmark_coords = {
+            landmark: tuple(map(float, coords.split(', ')))
+            for landmark, coords in self.philly_landmarks.items()
+        }
+        
+        # Parsing is a pure function of the lowercased query, so memoize it per instance
+        parse_cache = functools.lru_cache(maxsize=Config.SPATIAL_PARSE_CACHE_SIZE)
+        self._find_landmark = parse_cache(self._find_landmark)
+        self._detect_spatial = parse_cache(self._detect_spatial)
+        self._extract_location = parse_cache(self._extract_location)
+        self._distance_threshold = parse_cache(self._distance_threshold)
         
         logging.info("SpatialIntelligence initialized with geocoding cache and Philadelphia landmarks")
 
@@ -39,113 +326,100 @@ class SpatialIntelligence:
         Returns:
             bool: True if query contains spatial indicators, False otherwise
         """
+        return self._detect_spatial(query.lower())
+
+    def analyze_query(self, query):
+        """
+        Detect, extract the location and read the distance threshold in one pass.
+        
+        The query is lowercased and scanned for landmarks once, and the
+        location and distance parsing only run when the query is spatial.
+        
+        Args:
+            query (str): User query to analyze
+            
+        Returns:
+            SpatialAnalysis: Detection result with location and distance threshold
+        """
         query_lower = query.lower()
+        if not self._detect_spatial(query_lower):
+            return SpatialAnalysis(is_spatial=False)
+        return SpatialAnalysis(
+            is_spatial=True,
+            location=self._extract_location(query_lower),
+            distance_threshold=self._distance_threshold(query_lower),
+            landmark=self._find_landmark(query_lower)
+        )
+
+    def _find_landmark(self, query_lower):
+        """Return the leftmost Philadelphia landmark named in a lowercased query, or None."""
+        landmark_match = self._landmark_re.search(query_lower)
+        return landmark_match.group(0) if landmark_match else None
+
+    def _detect_spatial(self, query_lower):
+        """Spatial detection for an already lowercased query."""
+        landmark = self._find_landmark(query_lower)
+        
+        # Skip the pattern checks entirely for queries with no spatial trigger
+        if not landmark and not _SPATIAL_PREFILTER_RE.search(query_lower):
+            return False
         
         # First, check for explicit spatial indicators (most reliable)
-        explicit_spatial_patterns = [
-            r'\bnear\s+[a-zA-Z]',           # "near City Hall" (not "near 8pm")
-            r'\bclose\s+to\s+[a-zA-Z]',     # "close to Temple"
-            r'\bwithin\s+\d+.*(?:mile|km|block)', # "within 2 miles"
-            r'\b\d+\s*(?:mile|km|block)s?\s+(?:of|from)', # "2 miles from"
-            r'\b(?:walking|driving)\s+distance', # "walking distance"
-        ]
-        
-        for pattern in explicit_spatial_patterns:
-            if re.search(pattern, query_lower):
-                logging.info(f"Explicit spatial pattern detected: {pattern}")
-                return True
+        explicit_match = _EXPLICIT_SPATIAL_RE.search(query_lower)
+        if explicit_match:
+            logging.info(f"Explicit spatial pattern detected: {explicit_match.group(0)}")
+            return True
         
         # Check for Philadelphia landmarks
-        has_landmarks = any(landmark in query_lower for landmark in self.philly_landmarks.keys())
-        if has_landmarks:
+        if landmark:
             logging.info("Philadelphia landmark detected in query")
             return True
         
         # IMPROVED: Check for address patterns (both numbered and street names)
-        address_patterns = [
-            # Numbered addresses: "123 Main Street"
-            r'\d+\s+\w+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard)',
-            # Street names without numbers: "North Broad Street", "Market Street", etc.
-            r'(?:north|south|east|west)\s+\w+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard)',
-            r'\w+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard)(?:\s|$|,|\.)',
-            # Zip codes
-            r'\b19\d{3}\b'
-        ]
-        
-        for pattern in address_patterns:
-            if re.search(pattern, query_lower):
-                logging.info(f"Address pattern detected: {pattern}")
-                return True
+        address_match = _ADDRESS_RE.search(query_lower)
+        if address_match:
+            logging.info(f"Address pattern detected: {address_match.group(0)}")
+            return True
         
         # FIXED: Check for location prepositions but exclude time-related contexts
-        # Define time-related words that should NOT trigger spatial detection
-        time_words = [
-            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
-            'weekday', 'weekend', 'morning', 'afternoon', 'evening', 'night',
-            'today', 'tomorrow', 'yesterday', 'weekdays', 'weekends',
-            'am', 'pm', 'oclock', "o'clock"
-        ]
-        
-        # Create a pattern that excludes time words
-        time_word_pattern = r'\b(?:' + '|'.join(time_words) + r')\b'
-        
-        location_patterns = [
-            (r'\bin\s+(?!the\s+)(?!a\s+)(?!\d)([a-zA-Z]+(?:\s+[a-zA-Z]+)*)', 'in'),    # "in Philadelphia" but not "in the morning"
-            (r'\bat\s+(?!\d)([a-zA-Z]+(?:\s+[a-zA-Z]+)*)', 'at'),                      # "at Temple" but not "at 8pm"
-            (r'\bon\s+(?!a\s+)(?!the\s+)(?!\d)([a-zA-Z]+(?:\s+[a-zA-Z]+)*)', 'on'),    # "on North Broad Street" - FIXED VERSION
-        ]
-        
-        for pattern, preposition in location_patterns:
-            matches = re.finditer(pattern, query_lower)
-            for match in matches:
-                location_candidate = match.group(1).strip()
-                
-                # Check if the location candidate is actually a time word
-                if not re.search(time_word_pattern, location_candidate):
-                    logging.info(f"Location preposition pattern detected: {preposition} {location_candidate}")
-                    return True
-                else:
-                    logging.info(f"Excluded time context: {preposition} {location_candidate}")
+        match = _LOCATION_PREPOSITION_RE.search(query_lower)
+        while match:
+            preposition = match.group('prep') or match.group('at')
+            location_candidate = match.group('loc').strip()
+            
+            # Check if the location candidate is actually a time word
+            if _TIME_WORDS.isdisjoint(location_candidate.split()):
+                logging.info(f"Location preposition pattern detected: {preposition} {location_candidate}")
+                return True
+            logging.info(f"Excluded time context: {preposition} {location_candidate}")
+            
+            # Resume inside the rejected candidate so a later preposition still
+            # counts ("open on monday in fishtown")
+            match = _LOCATION_PREPOSITION_RE.search(query_lower, match.start('loc'))
         
         # Check for time-related contexts where "around" shouldn't trigger spatial mode
         # Only check "around" in time context after we've checked explicit spatial patterns
-        around_time_contexts = [
-            r'around\s+\d+\s*(am|pm|:\d+)',  # "around 8pm", "around 8:30am"
-            r'around\s+\d+\s*(o\'?clock)',   # "around 8 o'clock"
-        ]
-        
-        # Check if "around" is used in time context AND there are no spatial indicators
-        has_around_time = any(re.search(pattern, query_lower) for pattern in around_time_contexts)
+        has_around_time = _AROUND_TIME_RE.search(query_lower) is not None
         
         # Additional "around" pattern for location (now that we've checked time contexts)
-        around_location_pattern = r'\baround\s+(?!the\s+)(?!\d)([a-zA-Z]+(?:\s+[a-zA-Z]+)*)'  # "around Temple" but not "around 8pm"
-        around_matches = re.finditer(around_location_pattern, query_lower)
-        
-        for match in around_matches:
+        match = _AROUND_LOCATION_RE.search(query_lower)
+        while match:
             location_candidate = match.group(1).strip()
             # Check if it's not a time word
-            if not re.search(time_word_pattern, location_candidate):
+            if _TIME_WORDS.isdisjoint(location_candidate.split()):
                 logging.info(f"Around location pattern detected: around {location_candidate}")
                 return True
+            match = _AROUND_LOCATION_RE.search(query_lower, match.end())
         
         # If "around" is only used for time and no spatial indicators found, return False
         if has_around_time:
-            # Double-check: make sure there are truly no spatial indicators
-            other_time_contexts = [
-                r'open\s+around',                # "open around"
-                r'close\s+around',               # "close around"
-                r'hours.*around',                # "hours around"
-            ]
-            
             # If query matches other time contexts, it's not spatial
-            for time_pattern in other_time_contexts:
-                if re.search(time_pattern, query_lower):
-                    logging.info("Time context detected - not spatial")
-                    return False
+            if _OTHER_TIME_CONTEXT_RE.search(query_lower):
+                logging.info("Time context detected - not spatial")
+                return False
         
         # Final check: remaining spatial keywords (but only if not purely time context)
-        remaining_spatial_keywords = ['closest', 'nearest', 'vicinity', 'area', 'location']
-        has_remaining_spatial = any(keyword in query_lower for keyword in remaining_spatial_keywords)
+        has_remaining_spatial = any(keyword in query_lower for keyword in _REMAINING_SPATIAL_KEYWORDS)
         
         if has_remaining_spatial:
             logging.info("Remaining spatial keywords detected")
@@ -162,29 +436,100 @@ class SpatialIntelligence:
         Returns:
             tuple: (latitude, longitude) or None if geocoding fails
         """
+        # Normalize so "Temple University" and "temple university " share an entry
+        cache_key = location_text.strip().lower()
+        coords = self._lookup_known_coords(location_text, cache_key)
+        if coords:
+            return coords
+        return self._geocode_remote(location_text, cache_key)
+
+    def geocode_locations(self, location_texts):
+        """
+        Geocode several location strings, overlapping the Nominatim round trips.
+        
+        Cached, landmark and stored locations are resolved up front; only the
+        remaining distinct locations are sent to a thread pool of
+        Config.GEOCODING_MAX_WORKERS, with request starts still spaced by
+        Config.GEOCODING_MIN_INTERVAL.
+        
+        Args:
+            location_texts (list): Location descriptions to geocode
+            
+        Returns:
+            list: (latitude, longitude) tuple or None for each input, in order
+        """
+        results = {}
+        uncached = {}
+        for location_text in location_texts:
+            cache_key = location_text.strip().lower()
+            if cache_key in results or cache_key in uncached:
+                continue
+            coords = self._lookup_known_coords(location_text, cache_key)
+            if coords:
+                results[cache_key] = coords
+            else:
+                uncached[cache_key] = location_text
+        
+        if uncached:
+            with ThreadPoolExecutor(max_workers=Config.GEOCODING_MAX_WORKERS) as pool:
+                geocoded = pool.map(self._geocode_remote, uncached.values(), uncached.keys())
+                results.update(zip(uncached.keys(), geocoded))
+        
+        return [results[location_text.strip().lower()] for location_text in location_texts]
+
+    def _lookup_known_coords(self, location_text, cache_key):
+        """
+        Resolve a location from the caches or landmarks without a network call.
+        
+        Args:
+            location_text (str): Location description as given
+            cache_key (str): Normalized location text
+            
+        Returns:
+            tuple: (latitude, longitude) or None if the location is not known
+        """
         # Check cache first
-        if location_text in self.geocoding_cache:
+        if cache_key in self.geocoding_cache:
             logging.info(f"Using cached coordinates for: {location_text}")
-            return self.geocoding_cache[location_text]
+            return self.geocoding_cache[cache_key]
         
         # Check if it's a known Philadelphia landmark
-        location_lower = location_text.lower()
-        for landmark, coords in self.philly_landmarks.items():
-            if landmark in location_lower:
-                lat, lon = map(float, coords.split(', '))
-                self.geocoding_cache[location_text] = (lat, lon)
-                logging.info(f"Found landmark {landmark} at coordinates: {lat}, {lon}")
-                return (lat, lon)
-        
-        # Try geocoding with Nominatim
+        landmark = self._find_landmark(cache_key)
+        if landmark:
+            lat, lon = coords = self._philly_landmark_coords[landmark]
+            self.geocoding_cache[cache_key] = coords
+            logging.info(f"Found landmark {landmark} at coordinates: {lat}, {lon}")
+            return coords
+        
+        # Check coordinates persisted by earlier sessions
+        coords = self._load_stored_coords(cache_key)
+        if coords:
+            self.geocoding_cache[cache_key] = coords
+            logging.info(f"Using stored coordinates for: {location_text}")
+            return coords
+        return None
+
+    def _geocode_remote(self, location_text, cache_key):
+        """
+        Geocode a location with Nominatim and cache the result.
+        
+        Args:
+            location_text (str): Location description as given
+            cache_key (str): Normalized location text
+            
+        Returns:
+            tuple: (latitude, longitude) or None if geocoding fails
+        """
         try:
             # Add Philadelphia context for better results
             search_query = f"{location_text}, Philadelphia, PA"
+            self._wait_for_request_slot()
             location = self.geolocator.geocode(search_query)
             
             if location:
                 coords = (location.latitude, location.longitude)
-                self.geocoding_cache[location_text] = coords
+                self.geocoding_cache[cache_key] = coords
+                self._store_coords(cache_key, coords)
                 logging.info(f"Geocoded '{location_text}' to coordinates: {coords}")
                 return coords
             else:
@@ -198,199 +543,188 @@ class SpatialIntelligence:
             logging.error(f"Unexpected geocoding error for '{location_text}': {str(e)}")
             return None
 
+    def _wait_for_request_slot(self):
+        """Block until Config.GEOCODING_MIN_INTERVAL has passed since the last request started."""
+        with self._request_lock:
+            delay = self._next_request_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_request_at = time.monotonic() + Config.GEOCODING_MIN_INTERVAL
+
+    def _open_geocode_store(self, path):
+        """
+        Open the on-disk geocoding cache, creating it if needed.
+        The connection is opened once per path and shared by all instances.
+        
+        Args:
+            path (str): SQLite database path, or None to disable persistence
+            
+        Returns:
+            sqlite3.Connection: Open connection, or None if persistence is unavailable
+        """
+        if not path:
+            return None
+        try:
+            with _GEOCODE_STORE_LOCK:
+                connection = _GEOCODE_STORES.get(path)
+                if connection is None:
+                    directory = os.path.dirname(path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    connection = sqlite3.connect(path, check_same_thread=False)
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS geocodes ("
+                        "location TEXT PRIMARY KEY, latitude REAL NOT NULL, "
+                        "longitude REAL NOT NULL, stored_at REAL NOT NULL)"
+                    )
+                    connection.commit()
+                    _GEOCODE_STORES[path] = connection
+            return connection
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Persistent geocoding cache unavailable, using in-memory cache only: {str(e)}")
+            return None
+
+    def _load_stored_coords(self, cache_key):
+        """
+        Look up unexpired coordinates in the on-disk geocoding cache.
+        
+        Args:
+            cache_key (str): Normalized location text
+            
+        Returns:
+            tuple: (latitude, longitude) or None if not stored
+        """
+        if self._geocode_store is None:
+            return None
+        try:
+            with self._geocode_store_lock:
+                row = self._geocode_store.execute(
+                    "SELECT latitude, longitude FROM geocodes WHERE location = ? AND stored_at >= ?",
+                    (cache_key, time.time() - Config.GEOCODE_CACHE_TTL)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not read geocoding cache for '{cache_key}': {str(e)}")
+            return None
+        return tuple(row) if row else None
+
+    def _store_coords(self, cache_key, coords):
+        """
+        Persist geocoded coordinates so later sessions skip the Nominatim call.
+        
+        Args:
+            cache_key (str): Normalized location text
+            coords (tuple): (latitude, longitude)
+        """
+        if self._geocode_store is None:
+            return
+        try:
+            with self._geocode_store_lock, self._geocode_store:
+                self._geocode_store.execute(
+                    "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?)",
+                    (cache_key, coords[0], coords[1], time.time())
+                )
+        except sqlite3.Error as e:
+            logging.warning(f"Could not write geocoding cache for '{cache_key}': {str(e)}")
+
     def extract_location_from_query(self, query):
         """
         Extract location information from the user query with improved context awareness.
         FIXED VERSION to handle multi-word landmarks and complex locations.
         """
-        query_lower = query.lower()
+        return self._extract_location(query.lower())
 
+    def _extract_location(self, query_lower):
+        """Location extraction for an already lowercased query."""
         # --- PRIORITY 1: Check for known Philadelphia landmarks first ---
-        for landmark in self.philly_landmarks.keys():
-            if landmark in query_lower:
-                logging.info(f"Extracted landmark from query: '{landmark}'")
-                return landmark
+        landmark = self._find_landmark(query_lower)
+        if landmark:
+            logging.info(f"Extracted landmark from query: '{landmark}'")
+            return landmark
 
         # --- PRIORITY 2: Check for zip codes early (they're very specific) ---
-        zip_match = re.search(r'\b(19\d{3})\b', query_lower)
+        zip_match = _ZIP_RE.search(query_lower)
         if zip_match:
             zip_code = zip_match.group(1)
             logging.info(f"Extracted zip code from query: '{zip_code}'")
             return zip_code
 
-        # Helper function for word boundary validation - IMPROVED
-        def contains_excluded_words(text, excluded_words):
-            """Check if text contains any excluded words using word boundaries."""
-            text_lower = text.lower()
-            for word in excluded_words:
-                # Use word boundaries to match whole words only
-                if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                    logging.info(f"Found excluded word '{word}' in '{text}'")
-                    return True
-            return False
-
-        def extract_clean_location(text, stop_words=None):
-            """Extract clean location by removing stop words at the end."""
-            if not stop_words:
-                stop_words = ['has', 'have', 'with', 'on', 'at', 'in', 'is', 'are', 'handles', 'handle']
-            
-            words = text.strip().split()
-            # Remove stop words from the end
-            while words and words[-1].lower() in stop_words:
-                words.pop()
-            
-            return ' '.join(words) if words else text
-
         # --- PRIORITY 3: IMPROVED Multi-word landmark patterns ---
         # Handle "the [Landmark Name]" patterns specifically
-        landmark_patterns = [
-            # Pattern for "near the [Multi-word Landmark]"
-            r'near\s+the\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){1,4})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'close\s+to\s+the\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){1,4})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'at\s+the\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){1,4})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'around\s+the\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){1,4})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            
-            # Pattern for "near [Multi-word Landmark without 'the']"
-            r'near\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){1,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'close\s+to\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){1,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-        ]
-
-        for pattern in landmark_patterns:
-            match = re.search(pattern, query_lower)
+        for pattern in _LANDMARK_RES:
+            match = pattern.search(query_lower)
             if match:
                 location_text = match.group(1).strip()
                 # Clean up by removing trailing context words
-                clean_location = extract_clean_location(location_text)
+                clean_location = _extract_clean_location(location_text)
                 
                 # Validate it's not a service or excluded term
-                service_words = ['story', 'time', 'toddler', 'program', 'class', 'service', 'form', 'tax', 'application']
-                if not contains_excluded_words(clean_location, service_words) and len(clean_location.split()) >= 1:
+                if not _contains_excluded_words(clean_location, _SERVICE_WORDS_RE) and len(clean_location.split()) >= 1:
                     logging.info(f"Extracted multi-word landmark: '{clean_location}'")
                     return clean_location
 
+        # Street patterns (priorities 4 and 5) all need a street suffix after
+        # whitespace, so skip them for queries without one
+        has_street_suffix = _STREET_HINT_RE.search(query_lower) is not None
+
         # --- PRIORITY 4: IMPROVED Numbered and directional street patterns ---
-        
-        # Pattern 1: Numbered addresses with directional prefixes - FIXED
-        numbered_directional_pattern = r'\b((?:north|south|east|west)\s+\d+(?:st|nd|rd|th)?\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))\b'
-        numbered_directional_match = re.search(numbered_directional_pattern, query_lower)
-        if numbered_directional_match:
-            address = numbered_directional_match.group(1).strip()
-            logging.info(f"Extracted numbered directional street: '{address}'")
-            return address
-        
-        # Pattern 2: Regular numbered addresses
-        numbered_address_match = re.search(r'\b(\d{1,5}\s+[a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))\b', query_lower)
-        if numbered_address_match:
-            address = numbered_address_match.group(1).strip()
-            form_related_words = ['form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document']
-            if not contains_excluded_words(address, form_related_words):
-                logging.info(f"Extracted numbered address from query: '{address}'")
-                return address
-        
-        # Pattern 3: Directional streets with named streets - IMPROVED
-        directional_patterns = [
-            r'\b((?:north|south|east|west)\s+[a-zA-Z]+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))\b',
-            r'\b((?:north|south|east|west)\s+[a-zA-Z]+\s+[a-zA-Z]+\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))\b'
-        ]
-        
-        for pattern in directional_patterns:
-            directional_match = re.search(pattern, query_lower)
-            if directional_match:
-                street = directional_match.group(1).strip()
-                # Make sure it's not capturing service-related terms
-                excluded_words = ['story', 'time', 'toddler', 'has', 'have', 'with', 'program', 'class', 'service']
-                if not contains_excluded_words(street, excluded_words):
-                    logging.info(f"Extracted directional street from query: '{street}'")
+        # The first street mentioned that passes its validation wins
+        if has_street_suffix:
+            street_match = _STREET_RE.search(query_lower)
+            while street_match:
+                kind = street_match.lastgroup
+                street = street_match.group(kind).strip()
+                excluded_words_re, label = _STREET_KINDS[kind]
+                # Make sure it's not capturing form or service-related terms
+                if excluded_words_re is None or not _contains_excluded_words(street, excluded_words_re):
+                    logging.info(f"Extracted {label}: '{street}'")
                     return street
+                street_match = _STREET_RE.search(query_lower, street_match.start() + 1)
+
+        # Skip "around" patterns if it's followed by time indicators
+        if _AROUND_TIME_RE.search(query_lower):
+            preposition_patterns = _PREPOSITION_RES
+            simple_location_patterns = _SIMPLE_LOCATION_RES
+        else:
+            preposition_patterns = _PREPOSITION_WITH_AROUND_RES
+            simple_location_patterns = _SIMPLE_LOCATION_WITH_AROUND_RES
 
         # --- PRIORITY 5: Street patterns with prepositions - IMPROVED ---
-        preposition_patterns = [
-            # More specific patterns that stop at context words
-            r'near\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
-            r'close\s+to\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
-            r'on\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s+(?:on|at|in)\b|\s*$)',
-            r'at\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
-            r'in\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
-            r'around\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2}\s+(?:street|st|avenue|ave|road|rd|blvd|boulevard))(?:\s|$)',
-        ]
-        
-        # Skip "around" pattern if it's followed by time indicators
-        if re.search(r'around\s+\d+\s*(am|pm|:\d+|o\'?clock)', query_lower):
-            preposition_patterns = [p for p in preposition_patterns if 'around' not in p]
-
-        for pattern in preposition_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                location_text = match.group(1).strip()
-                logging.info(f"Found potential street with preposition pattern: '{location_text}'")
-                
-                # Enhanced validation for preposition patterns
-                non_location_words = [
-                    'form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document', 'paper',
-                    'apply', 'retirement', 'benefits', 'where', 'can',
-                    'story', 'time', 'toddler', 'program', 'class', 'service'
-                ]
-                
-                if not contains_excluded_words(location_text, non_location_words):
-                    logging.info(f"Extracted street from preposition pattern: '{location_text}'")
-                    return location_text
-                else:
-                    logging.info(f"Rejected street '{location_text}' due to non-location words")
+        if has_street_suffix:
+            for pattern in preposition_patterns:
+                match = pattern.search(query_lower)
+                if match:
+                    location_text = match.group(1).strip()
+                    logging.info(f"Found potential street with preposition pattern: '{location_text}'")
+                    
+                    # Enhanced validation for preposition patterns
+                    if not _contains_excluded_words(location_text, _NON_LOCATION_WORDS_RE):
+                        logging.info(f"Extracted street from preposition pattern: '{location_text}'")
+                        return location_text
+                    else:
+                        logging.info(f"Rejected street '{location_text}' due to non-location words")
 
         # --- PRIORITY 6: IMPROVED Simple location extraction ---
-        simple_location_patterns = [
-            # Patterns that handle multi-word locations better and stop at context words
-            r'near\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'close\s+to\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'at\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'in\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-            r'around\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,3})(?:\s+(?:has|have|with|on|at|in|is|are|handles|handle)\b|\s*$)',
-        ]
-        
-        # Skip "around" pattern if it's followed by time indicators
-        if re.search(r'around\s+\d+\s*(am|pm|:\d+|o\'?clock)', query_lower):
-            simple_location_patterns = [p for p in simple_location_patterns if 'around' not in p]
-        
         for pattern in simple_location_patterns:
-            match = re.search(pattern, query_lower)
+            match = pattern.search(query_lower)
             if match:
                 location_text = match.group(1).strip()
                 # Clean up by removing trailing context words
-                clean_location = extract_clean_location(location_text)
+                clean_location = _extract_clean_location(location_text)
                 
-                # UPDATED: More lenient exclusion list - removed "the" as it's common in landmarks
-                non_location_words = [
-                    'form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document', 'paper',
-                    'apply', 'retirement', 'benefits', 'where', 'can',
-                    'wednesday', 'monday', 'tuesday', 'thursday', 'friday', 'saturday', 'sunday',
-                    'story', 'time', 'toddler', 'program', 'class', 'service'
-                    # NOTE: Removed 'the' from excluded words to allow "Philadelphia Museum" etc.
-                ]
-                
-                if not contains_excluded_words(clean_location, non_location_words) and len(clean_location.split()) >= 1:
+                if not _contains_excluded_words(clean_location, _SIMPLE_NON_LOCATION_WORDS_RE) and len(clean_location.split()) >= 1:
                     # Additional validation: must contain at least one letter
-                    if re.search(r'[a-zA-Z]', clean_location):
+                    if _HAS_LETTER_RE.search(clean_location):
                         logging.info(f"Extracted simple location from query: '{clean_location}'")
                         return clean_location
 
         # --- PRIORITY 7: Distance-based patterns - IMPROVED ---
-        distance_patterns = [
-            r'within\s+\d+(?:\.\d+)?\s+(?:miles?|mi|km|blocks?)\s+of\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,4})(?:\s+(?:has|have|with|on|at|in)\b|\s*$)',
-            r'\d+\s*(?:miles?|mi|km|blocks?)\s+(?:of|from)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,4})(?:\s+(?:has|have|with|on|at|in)\b|\s*$)',
-        ]
-        
-        for pattern in distance_patterns:
-            match = re.search(pattern, query_lower)
+        for pattern in _DISTANCE_LOCATION_RES:
+            match = pattern.search(query_lower)
             if match:
                 location_text = match.group(1).strip()
-                clean_location = extract_clean_location(location_text)
+                clean_location = _extract_clean_location(location_text)
                 
-                non_location_words = [
-                    'form', 'tax', 'w2', 'w-2', '1099', 'statement', 'document', 'paper',
-                    'apply', 'retirement', 'benefits', 'where', 'can',
-                    'story', 'time', 'toddler', 'program', 'class', 'service'
-                ]
-                if not contains_excluded_words(clean_location, non_location_words):
+                if not _contains_excluded_words(clean_location, _NON_LOCATION_WORDS_RE):
                     logging.info(f"Extracted location from distance pattern: '{clean_location}'")
                     return clean_location
         
@@ -407,24 +741,19 @@ class SpatialIntelligence:
         Returns:
             float: Distance threshold in miles
         """
-        query_lower = query.lower()
-        
+        return self._distance_threshold(query.lower())
+
+    def _distance_threshold(self, query_lower):
+        """Distance threshold for an already lowercased query."""
         # Extract explicit distance mentions
-        distance_match = re.search(r'(\d+(?:\.\d+)?)\s*(miles?|mi|km|blocks?)', query_lower)
+        distance_match = _DISTANCE_RE.search(query_lower)
         if distance_match:
-            value = float(distance_match.group(1))
-            unit = distance_match.group(2)
-            if 'km' in unit:
-                return value * 0.621371  # Convert km to miles
-            elif 'block' in unit:
-                return value * 0.1  # Assume 10 blocks per mile
-            else:
-                return value
+            return float(distance_match.group(1)) * _MILES_PER_UNIT[distance_match.group(2)]
         
         # Use semantic thresholds
-        for term, threshold in self.proximity_thresholds.items():
-            if term in query_lower:
-                return threshold
+        terms = self._proximity_re.findall(query_lower)
+        if terms:
+            return self.proximity_thresholds[min(terms, key=self._proximity_rank.__getitem__)]
         
         # Default threshold
         return Config.DEFAULT_DISTANCE_THRESHOLD
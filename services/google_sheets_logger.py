@@ -1,19 +1,284 @@
 """
-Simple Google Sheets Logger - Two Columns Only
-Session_ID | Complete_Log_Content
+Simple Google Sheets Logger
+Timestamp | Session_ID | Complete_Log_Content | Chunk_Index
+
+Logs longer than one cell are split across consecutive rows that share the
+timestamp and session ID; join the content cells in Chunk_Index order to
+reassemble them.
+
+With Config.GOOGLE_SHEETS_COMPRESS_LOGS enabled the log column holds gzip+base64
+text instead (Complete_Log_Content_Gzb64); read it back with
+gzip.decompress(base64.b64decode(joined_cells)), or zlib.decompressobj(wbits=31)
+for a log that was cut at the size limit.
 """
 
+import base64
+import gzip
 import logging
+import atexit
+import functools
+import queue
+import random
+import threading
+import time
 import gspread
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timezone
+from pathlib import PurePath
 import os
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+_SCOPES = (
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive'
+)
+_HEADERS = ('Timestamp', 'Session_ID', 'Complete_Log_Content', 'Chunk_Index')
+_COMPRESSED_HEADERS = ('Timestamp', 'Session_ID', 'Complete_Log_Content_Gzb64', 'Chunk_Index')
+
+# Google Sheets rejects cells over 50,000 characters; leave room for the marker.
+# A multiple of 4 so base64 text splits on whole quanta.
+_MAX_CELL_LENGTH = 49000
+_TRUNCATION_MARKER = "\n\n[LOG TRUNCATED - exceeds Google Sheets cell limit]"
+
+# Rate limiting and transient server errors are worth retrying; anything else is not
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503})
+_MAX_RETRY_DELAY = 32
+
+# Keep-alive connections shared by the upload workers of every session
+_HTTP_POOL_SIZE = 32
+
+# Uploads from every logger instance (one per Streamlit session), drained by a
+# single background worker: (logger, rows, log_file_path, file_signature)
+_UPLOAD_QUEUE = queue.Queue()
+_UPLOAD_WORKER_LOCK = threading.Lock()
+_upload_worker = None
+
+
+@functools.lru_cache(maxsize=4)
+def _open_worksheet(credentials_items, sheet_name, worksheet_name):
+    """
+    Authorize with the service account and open the log worksheet.
+    
+    Cached so every logger instance (one per Streamlit session) shares a single
+    authorized client, and its pooled HTTP session, instead of minting new
+    credentials and opening new connections each time. Failures raise and are
+    therefore not cached.
+    
+    Args:
+        credentials_items (frozenset): Items of the service account info dict
+        sheet_name (str): Name of the spreadsheet
+        worksheet_name (str): Name of the worksheet inside the spreadsheet
+        
+    Returns:
+        tuple: (gspread client, spreadsheet, worksheet)
+    """
+    # Authenticate using service account info from Streamlit secrets
+    creds = Credentials.from_service_account_info(dict(credentials_items), scopes=list(_SCOPES))
+    
+    # Retries are handled in the worker, so the adapter must not add its own
+    session = AuthorizedSession(creds)
+    session.mount('https://', HTTPAdapter(pool_connections=_HTTP_POOL_SIZE, pool_maxsize=_HTTP_POOL_SIZE, max_retries=0))
+    gc = gspread.Client(auth=creds, session=session)
+    
+    # Open the spreadsheet
+    spreadsheet = gc.open(sheet_name)
+    logger.info("Successfully opened spreadsheet: %s", sheet_name)
+    
+    # Get or create simple worksheet
+    try:
+        worksheet = spreadsheet.worksheet(worksheet_name)
+        logger.info("Using existing worksheet: %s", worksheet_name)
+        _migrate_headers(worksheet)
+    except gspread.WorksheetNotFound:
+        worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=len(_HEADERS))
+        logger.info("Created new worksheet: %s", worksheet_name)
+        _setup_simple_headers(worksheet)
+    
+    return gc, spreadsheet, worksheet
+
+
+def _start_upload_worker():
+    """Start the shared upload worker on first use and flush its queue at interpreter exit."""
+    global _upload_worker
+    with _UPLOAD_WORKER_LOCK:
+        if _upload_worker is None:
+            _upload_worker = threading.Thread(target=_upload_worker_loop, name="GoogleSheetsLogger", daemon=True)
+            _upload_worker.start()
+            atexit.register(_UPLOAD_QUEUE.join)
+
+
+def _upload_worker_loop():
+    """Drain the shared queue; a helper handles each batch so no logger stays referenced while idle."""
+    while True:
+        _write_uploads(_take_uploads())
+
+
+def _take_uploads():
+    """
+    Wait for a queued upload and take up to GOOGLE_SHEETS_FLUSH_ROWS of them.
+    
+    Returns:
+        list: (logger, rows, log_file_path, file_signature) items
+    """
+    items = [_UPLOAD_QUEUE.get()]
+    while len(items) < Config.GOOGLE_SHEETS_FLUSH_ROWS:
+        try:
+            items.append(_UPLOAD_QUEUE.get_nowait())
+        except queue.Empty:
+            break
+    return items
+
+
+def _write_uploads(items):
+    """
+    Write queued uploads with one append_rows request per worksheet.
+    
+    Args:
+        items (list): (logger, rows, log_file_path, file_signature) items
+    """
+    # Loggers normally share one cached worksheet; batch per worksheet regardless
+    batches = {}
+    for item in items:
+        batches.setdefault(id(item[0].worksheet), []).append(item)
+    
+    for batch in batches.values():
+        rows = [row_data for _, session_rows, _, _ in batch for row_data in session_rows]
+        try:
+            batch[0][0]._append_rows_with_retry(rows)
+            logger.info("Successfully logged %d session rows to Google Sheets", len(rows))
+        except Exception as e:
+            logger.error("Failed to write %d session rows to Google Sheets: %s", len(rows), e)
+            # Forget the failed uploads so the next call sends these logs again
+            for owner, _, log_file_path, file_signature in batch:
+                owner._forget_upload(log_file_path, file_signature)
+        finally:
+            for owner, _, _, _ in batch:
+                owner._upload_done()
+                _UPLOAD_QUEUE.task_done()
+
+
+def _current_headers():
+    """Headers for the configured log column format."""
+    return _COMPRESSED_HEADERS if Config.GOOGLE_SHEETS_COMPRESS_LOGS else _HEADERS
+
+
+def _setup_simple_headers(worksheet):
+    """Set up the Timestamp, Session_ID, log content and Chunk_Index headers."""
+    try:
+        worksheet.append_row(list(_current_headers()))
+        logger.info("Simple headers added to Google Sheet")
+    except Exception as e:
+        logger.error("Failed to add simple headers: %s", e)
+
+
+def _migrate_headers(worksheet):
+    """
+    Bring an existing worksheet's header row up to the current format.
+    
+    Sheets created before logs were split into chunks have three columns and no
+    Chunk_Index header, and the log column header must match the compression setting.
+    
+    Args:
+        worksheet: Existing log worksheet
+    """
+    headers = list(_current_headers())
+    try:
+        if worksheet.row_values(1) == headers:
+            return
+        if worksheet.col_count < len(headers):
+            worksheet.resize(cols=len(headers))
+        worksheet.update(range_name='A1', values=[headers])
+        logger.info("Updated Google Sheet headers to: %s", headers)
+    except Exception as e:
+        logger.error("Failed to update Google Sheet headers: %s", e)
+
+
+def _retry_after_seconds(response):
+    """
+    Read the delay requested by a Retry-After header.
+    
+    Args:
+        response: HTTP response attached to the API error
+        
+    Returns:
+        float or None: Seconds to wait, or None if the header is missing or not numeric
+    """
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return max(0.0, float(headers['Retry-After']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _read_compressed_log(log_file_path, max_length):
+    """
+    Read a log file as gzip-compressed, base64-encoded text.
+    
+    Args:
+        log_file_path (str): Path to the session log file
+        max_length (int): Maximum length of the encoded text
+        
+    Returns:
+        str: Encoded log, cut to a whole number of base64 quanta if over max_length
+    """
+    with open(log_file_path, 'rb') as f:
+        compressed = gzip.compress(f.read(), compresslevel=6)
+    
+    encoded = base64.b64encode(compressed).decode('ascii')
+    if len(encoded) > max_length:
+        logger.warning("Compressed log %s exceeds the size limit, truncating", log_file_path)
+        encoded = encoded[:max_length - max_length % 4]
+    return encoded
+
+
+def _split_cells(content):
+    """
+    Split log content into pieces that each fit in one cell.
+    
+    Args:
+        content (str): Log content
+        
+    Returns:
+        list: Cell-sized pieces in order; a single empty piece for an empty log
+    """
+    return [content[i:i + _MAX_CELL_LENGTH] for i in range(0, len(content), _MAX_CELL_LENGTH)] or ['']
+
+
+def _split_utf8_cells(raw_content):
+    """
+    Split raw UTF-8 log bytes into decoded pieces that each fit in one cell.
+    
+    Pieces are cut by byte count, which bounds their character count too, and
+    each cut is moved back so no multi-byte character is split between cells.
+    
+    Args:
+        raw_content (bytes): Log content as read from disk
+        
+    Returns:
+        list: Decoded cell-sized pieces in order; a single empty piece for an empty log
+    """
+    chunks = []
+    start = 0
+    total = len(raw_content)
+    while start < total:
+        end = min(start + _MAX_CELL_LENGTH, total)
+        if end < total:
+            while end > start and raw_content[end] & 0xC0 == 0x80:
+                end -= 1
+            if end == start:
+                end = start + _MAX_CELL_LENGTH  # no character boundary: not UTF-8, cut anyway
+        chunks.append(raw_content[start:end].decode('utf-8', errors='replace'))
+        start = end
+    return chunks or ['']
+
 
 class GoogleSheetsLogger:
     """
-    Simple service to log session data to Google Sheets in just two columns.
+    Simple service to log session data to Google Sheets, one row per log chunk.
     """
     
     def __init__(self):
@@ -26,62 +291,44 @@ class GoogleSheetsLogger:
         self.worksheet = None
         self.initialized = False
         
+        # Rows are queued by callers and written in batches by the shared background worker;
+        # this counts the ones from this logger that are not written yet
+        self._pending_uploads = 0
+        self._pending_uploads_done = threading.Condition()
+        
+        # (mtime_ns, size) of each log file as last queued, to skip unchanged re-uploads
+        self._last_upload = {}
+        self._last_upload_lock = threading.Lock()
+        self._max_retries = Config.GOOGLE_SHEETS_MAX_RETRIES
+        self._compress_logs = Config.GOOGLE_SHEETS_COMPRESS_LOGS
+        self._max_log_length = _MAX_CELL_LENGTH * Config.GOOGLE_SHEETS_MAX_LOG_CHUNKS
+        
         # Initialize connection
         self._initialize_connection()
         
-        logging.info(f"Simple GoogleSheetsLogger initialized for sheet: {self.sheet_name}")
+        if self.initialized:
+            _start_upload_worker()
+        
+        logger.info("Simple GoogleSheetsLogger initialized for sheet: %s", self.sheet_name)
     
     def _initialize_connection(self):
         """Initialize connection to Google Sheets."""
         try:
-            # Define the scope
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            
-            # Authenticate using service account info from Streamlit secrets
-            creds = Credentials.from_service_account_info(self.credentials, scopes=scope)
-            self.gc = gspread.authorize(creds)
-            
-            # Open the spreadsheet
             try:
-                self.spreadsheet = self.gc.open(self.sheet_name)
-                logging.info(f"Successfully opened spreadsheet: {self.sheet_name}")
+                self.gc, self.spreadsheet, self.worksheet = _open_worksheet(
+                    frozenset(self.credentials.items()), self.sheet_name, self.worksheet_name
+                )
             except gspread.SpreadsheetNotFound:
-                logging.error(f"Spreadsheet '{self.sheet_name}' not found. Make sure it exists and is shared with logger@dreamkg.iam.gserviceaccount.com")
+                logger.error("Spreadsheet '%s' not found. Make sure it exists and is shared with logger@dreamkg.iam.gserviceaccount.com", self.sheet_name)
                 return
             
-            # Get or create simple worksheet
-            try:
-                self.worksheet = self.spreadsheet.worksheet(self.worksheet_name)
-                logging.info(f"Using existing worksheet: {self.worksheet_name}")
-            except gspread.WorksheetNotFound:
-                self.worksheet = self.spreadsheet.add_worksheet(title=self.worksheet_name, rows=1000, cols=3)
-                logging.info(f"Created new worksheet: {self.worksheet_name}")
-                self._setup_simple_headers()
-            
             self.initialized = True
-            logging.info("Simple Google Sheets connection initialized successfully")
+            logger.info("Simple Google Sheets connection initialized successfully")
             
         except Exception as e:
-            logging.error(f"Failed to initialize Google Sheets connection: {str(e)}")
+            logger.error("Failed to initialize Google Sheets connection: %s", e)
             self.initialized = False
     
-    def _setup_simple_headers(self):
-        """Set up simple two-column headers."""
-        headers = [
-            'Timestamp',
-            'Session_ID', 
-            'Complete_Log_Content'
-        ]
-        
-        try:
-            self.worksheet.append_row(headers)
-            logging.info("Simple headers added to Google Sheet")
-        except Exception as e:
-            logging.error(f"Failed to add simple headers: {str(e)}")
-    
     def log_session_data(self, log_file_path, metrics_data=None):
         """
         Log session data to Google Sheets - just Session ID and complete log content.
@@ -91,34 +338,94 @@ class GoogleSheetsLogger:
             metrics_data (dict): Optional metrics data (ignored in simple version)
         """
         if not self.initialized:
-            logging.warning("Google Sheets logger not initialized, skipping log upload")
+            logger.warning("Google Sheets logger not initialized, skipping log upload")
             return
         
         try:
             # Read the complete log file
-            if not os.path.exists(log_file_path):
-                logging.warning(f"Log file not found: {log_file_path}")
+            try:
+                stat_result = os.stat(log_file_path)
+            except FileNotFoundError:
+                logger.warning("Log file not found: %s", log_file_path)
                 return
             
-            with open(log_file_path, 'r', encoding='utf-8') as f:
-                complete_log_content = f.read()
+            file_size = stat_result.st_size
+            file_signature = (stat_result.st_mtime_ns, file_size)
+            if self._last_upload.get(log_file_path) == file_signature:
+                logger.debug("Log file unchanged since last upload, skipping: %s", log_file_path)
+                return
+            
+            if self._compress_logs:
+                log_chunks = _split_cells(_read_compressed_log(log_file_path, self._max_log_length))
+            else:
+                # Read at most GOOGLE_SHEETS_MAX_LOG_CHUNKS cells' worth; a further byte means truncation.
+                # Undecodable bytes become U+FFFD instead of failing the whole upload.
+                with open(log_file_path, 'rb') as f:
+                    raw_content = f.read(self._max_log_length)
+                    truncated = file_size > self._max_log_length and bool(f.read(1))
+                log_chunks = _split_utf8_cells(raw_content)
+                if truncated:
+                    log_chunks[-1] += _TRUNCATION_MARKER
             
             # Extract session ID from filename
-            session_id = os.path.basename(log_file_path).replace('.log', '')
+            session_id = PurePath(log_file_path).stem
             
-            # Create simple row with just timestamp, session ID and complete log content
-            row_data = [
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),  # Timestamp
-                session_id,                                     # Session_ID
-                complete_log_content                            # Complete_Log_Content
+            # One row per chunk, sharing the timestamp and session ID
+            timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            rows = [
+                [timestamp, session_id, log_chunk, chunk_index]
+                for chunk_index, log_chunk in enumerate(log_chunks)
             ]
             
-            # Append to Google Sheets
-            self.worksheet.append_row(row_data)
-            logging.info(f"Successfully logged simple session data to Google Sheets: {session_id}")
+            # Hand the rows to the background worker; the upload happens off this thread
+            with self._last_upload_lock:
+                self._last_upload[log_file_path] = file_signature
+            with self._pending_uploads_done:
+                self._pending_uploads += 1
+            _UPLOAD_QUEUE.put((self, rows, log_file_path, file_signature))
+            logger.debug("Queued simple session data for Google Sheets: %s", session_id)
             
         except Exception as e:
-            logging.error(f"Failed to log simple session data to Google Sheets: {str(e)}")
+            logger.error("Failed to log simple session data to Google Sheets: %s", e)
+    
+    def flush(self):
+        """Block until every row queued by this logger has been handled by the background worker."""
+        with self._pending_uploads_done:
+            self._pending_uploads_done.wait_for(lambda: self._pending_uploads == 0)
+    
+    def _upload_done(self):
+        """Record that the background worker has handled one upload from this logger."""
+        with self._pending_uploads_done:
+            self._pending_uploads -= 1
+            self._pending_uploads_done.notify_all()
+    
+    def _forget_upload(self, log_file_path, file_signature):
+        """Forget a failed upload so the same log file is sent again on the next call."""
+        with self._last_upload_lock:
+            if self._last_upload.get(log_file_path) == file_signature:
+                del self._last_upload[log_file_path]
+    
+    def _append_rows_with_retry(self, rows):
+        """
+        Append rows, backing off exponentially with jitter on transient API errors.
+        
+        Args:
+            rows (list): Rows to append to the worksheet
+        """
+        for attempt in range(self._max_retries + 1):
+            try:
+                self.worksheet.append_rows(rows, value_input_option='RAW', insert_data_option='INSERT_ROWS')
+                return
+            except gspread.exceptions.APIError as e:
+                status_code = getattr(e.response, 'status_code', None)
+                if status_code not in _RETRYABLE_STATUS_CODES or attempt == self._max_retries:
+                    raise
+                
+                delay = _retry_after_seconds(e.response)
+                if delay is None:
+                    delay = min(_MAX_RETRY_DELAY, 2 ** attempt) + random.random()
+                logger.warning("Google Sheets returned %s, retrying in %.1fs", status_code, delay)
+                time.sleep(delay)
     
     def test_connection(self):
         """Test the Google Sheets connection."""
@@ -127,8 +434,8 @@ class GoogleSheetsLogger:
         
         try:
             cell_value = self.worksheet.cell(1, 1).value
-            logging.info(f"Google Sheets connection test successful. First cell value: {cell_value}")
+            logger.info("Google Sheets connection test successful. First cell value: %s", cell_value)
             return True
         except Exception as e:
-            logging.error(f"Google Sheets connection test failed: {str(e)}")
+            logger.error("Google Sheets connection test failed: %s", e)
             return False
\ No newline at end of file
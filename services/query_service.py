@@ -1,14 +1,583 @@
 import re
+import json
 import logging
 import time
+import functools
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor
 from langchain_groq import ChatGroq
-from langchain.callbacks import get_openai_callback
 from config import Config
 from models.spatial_intelligence import SpatialIntelligence
 from models.conversation_memory import ConversationMemory
 from database.neo4j_client import Neo4jClient
 from templates.prompts import PromptTemplateFactory
 
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; token estimates fall back to ~4 characters per token
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# City Hall, used by the app when no user location is available
+_DEFAULT_COORDS = (39.952335, -75.163789)
+
+_SPATIAL_CONTEXT_TEMPLATE = """
+USER LOCATION: {lat}, {lon} ({location_text})
+DISTANCE THRESHOLD: {distance_threshold} miles
+USER COORDINATES: user_latitude = {lat}, user_longitude = {lon}
+DISTANCE THRESHOLD: distance_threshold = {distance_threshold}
+
+SPATIAL QUERY INSTRUCTIONS:
+- Include distance calculations in your Cypher query using the provided coordinates
+- Filter results ONLY by the distance threshold (distance_miles <= {distance_threshold})
+- DO NOT add location-based filters (street, city, zipcode, state) - distance filtering handles location
+- Sort results by distance (closest first)
+- Include distance_miles in the result set
+- The coordinates represent the {location_text} - use distance, not text matching
+{service_context}"""
+
+# Shared by all sessions so speculative fallback generations stay within a fixed concurrency
+_FALLBACK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=Config.SPECULATIVE_FALLBACK_WORKERS, thread_name_prefix="cypher-fallback"
+)
+
+
+# Fields shared by every failed process_query / process_query_with_coordinates result;
+# callers add 'error', 'is_spatial' and fresh 'token_usage' / 'service_keywords' containers
+_FAILED_QUERY_RESULT = MappingProxyType({
+    'success': False,
+    'results': None,
+    'spatial_info': None,
+    'used_memory': False,
+    'expanded_radius': False,
+    'closest_search': False,
+    'primary_service': None,
+    # Enhanced metrics (default values)
+    'neo4j_duration': 0.0,
+    'llm_duration': 0.0,
+    'spatial_duration': 0.0,
+    'first_token_time': None,
+    'generation_time': None,
+    'normalization_duration': 0.0,
+    'memory_duration': 0.0,
+    'spatial_detection_duration': 0.0
+})
+
+# Search tiers tried in order by the multi-tier Cypher prompt
+_CYPHER_TIERS = ('primary', 'expanded', 'closest')
+
+
+def _bucket_coordinates(coordinates):
+    """Snap (latitude, longitude) to the Config.COORDINATE_GRID_DECIMALS grid."""
+    return (
+        round(coordinates[0], Config.COORDINATE_GRID_DECIMALS),
+        round(coordinates[1], Config.COORDINATE_GRID_DECIMALS)
+    )
+
+
+def _parse_cypher_tiers(response_text):
+    """
+    Parse the JSON object returned by the multi-tier Cypher prompt.
+    
+    Args:
+        response_text (str): Raw LLM response
+        
+    Returns:
+        dict: Cypher text for 'primary', 'expanded' and 'closest'
+        
+    Raises:
+        ValueError: If the response does not hold all three queries
+    """
+    start = response_text.find('{')
+    end = response_text.rfind('}')
+    if start == -1 or end < start:
+        raise ValueError("no JSON object in response")
+    tiers = json.loads(response_text[start:end + 1])
+    if not isinstance(tiers, dict):
+        raise ValueError("response JSON is not an object")
+    for tier in _CYPHER_TIERS:
+        if not isinstance(tiers.get(tier), str) or not tiers[tier].strip():
+            raise ValueError(f"missing '{tier}' query")
+    return tiers
+
+
+# Where LLM responses report token usage, tried in order:
+# (extractor, input token key, output token key)
+_TOKEN_USAGE_EXTRACTORS = (
+    (lambda response: response.usage_metadata, 'input_tokens', 'output_tokens'),
+    (lambda response: response.response_metadata['token_usage'], 'prompt_tokens', 'completion_tokens'),
+    (lambda response: response.response_metadata['usage'], 'prompt_tokens', 'completion_tokens'),
+)
+
+
+def _token_usage_from_response(response):
+    """
+    Read provider-reported token usage from an LLM response.
+    
+    Args:
+        response: LLM response message
+        
+    Returns:
+        dict: total_tokens, input_tokens and output_tokens, or empty if none were reported
+    """
+    for extract, input_key, output_key in _TOKEN_USAGE_EXTRACTORS:
+        try:
+            usage = extract(response)
+        except (AttributeError, KeyError, TypeError):
+            continue
+        if usage and usage.get('total_tokens'):
+            return {
+                'total_tokens': usage['total_tokens'],
+                'input_tokens': usage.get(input_key, 0),
+                'output_tokens': usage.get(output_key, 0)
+            }
+    return {}
+
+
+@functools.lru_cache(maxsize=1)
+def _token_encoder():
+    """Load the tokenizer used for token estimates once, or None if it is unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        # Groq-hosted models have no tiktoken encoding of their own; cl100k_base is a close proxy
+        return tiktoken.get_encoding(Config.TOKEN_ESTIMATE_ENCODING)
+    except Exception as e:
+        logger.warning("Token encoder unavailable, estimating from text length: %s", e)
+        return None
+
+
+def _estimate_tokens(text):
+    """
+    Estimate the number of tokens in a text when the provider reports no usage.
+    
+    Args:
+        text (str): Text sent to or received from the LLM
+        
+    Returns:
+        int: Estimated token count, at least 1
+    """
+    encoder = _token_encoder()
+    if encoder is None:
+        # Rough estimation: ~4 characters per token for most models
+        return max(1, len(text) // 4)
+    return max(1, len(encoder.encode(text, disallowed_special=())))
+
+
+def _result_cache_key(processed_query, coordinates):
+    """Cache key for a fresh query: case- and whitespace-insensitive text plus grid-snapped coordinates."""
+    return (' '.join(processed_query.lower().split()), tuple(coordinates))
+
+
+class _QueryResultCache:
+    """
+    Thread-safe LRU of recent search results with a time-to-live.
+    Shared by all sessions, since a fresh query's result depends only on its text and coordinates.
+    Identical searches running at the same time are coalesced into one.
+    """
+    
+    def __init__(self, max_size, ttl):
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.ttl = ttl
+    
+    def _lookup(self, key):
+        """Return the live (query_result, distance_threshold) entry for key; call with the lock held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, query_result, distance_threshold = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return query_result, distance_threshold
+    
+    def get_or_search(self, key, search):
+        """
+        Return the cached result for key, or run search() once for every caller
+        asking for key at the same time and cache its successful result.
+        
+        Args:
+            key (tuple): Key from _result_cache_key
+            search (callable): Runs the search, returning (query_result, distance_threshold)
+            
+        Returns:
+            tuple: (query_result, distance_threshold, shared), where shared is True when the
+            result came from the cache or from another caller's search (see _shared_copy)
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            pending = None
+            if entry is None:
+                pending = self._pending.get(key)
+                leader = pending is None
+                if leader:
+                    pending = self._pending[key] = Future()
+        
+        if entry is not None:
+            return self._shared_copy(entry[0]), entry[1], True
+        
+        if not leader:
+            query_result, distance_threshold = pending.result()
+            return self._shared_copy(query_result), distance_threshold, True
+        
+        try:
+            query_result, distance_threshold = search()
+            if query_result['success']:
+                self.put(key, query_result, distance_threshold)
+            pending.set_result((query_result, distance_threshold))
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+        return query_result, distance_threshold, False
+    
+    @staticmethod
+    def _shared_copy(query_result):
+        """Copy a result for another caller, with zeroed timings and token_usage {'cache_hit': True}."""
+        cached_result = dict(query_result)
+        if cached_result['results']:
+            cached_result['results'] = list(cached_result['results'])
+        cached_result.update({
+            'token_usage': {'cache_hit': True},
+            'neo4j_duration': 0.0,
+            'llm_duration': 0.0,
+            'spatial_duration': 0.0,
+            'first_token_time': None,
+            'generation_time': None
+        })
+        return cached_result
+    
+    def put(self, key, query_result, distance_threshold):
+        """
+        Store a search result, evicting the least recently used entries beyond max_size.
+        
+        Args:
+            key (tuple): Key from _result_cache_key
+            query_result (dict): Result of the search tier that was used
+            distance_threshold (float): Threshold reported in spatial_info for this result
+        """
+        stored_result = dict(query_result)
+        if stored_result['results']:
+            stored_result['results'] = list(stored_result['results'])
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), stored_result, distance_threshold)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_RESULT_CACHE = _QueryResultCache(Config.QUERY_RESULT_CACHE_SIZE, Config.QUERY_RESULT_CACHE_TTL)
+
+# LLM categorizations by detected services, shared by all sessions: {services tuple: categories}.
+# Only filled for services whose category does not depend on the rest of the query.
+_CATEGORIZATION_CACHE = OrderedDict()
+_CATEGORIZATION_CACHE_LOCK = threading.Lock()
+
+
+class _SubstringScanner:
+    """Finds which of a fixed set of literals occur in a text with a single regex scan."""
+    
+    def __init__(self, literals):
+        # Longest first, so each position reports the longest literal starting there
+        literals = sorted(set(literals), key=len, reverse=True)
+        self._scan_re = re.compile(
+            '(?=(' + '|'.join(map(re.escape, literals)) + '))'
+        ) if literals else None
+        # A reported literal implies every literal it contains, including shorter ones at the same position
+        self._implied = {
+            literal: frozenset(other for other in literals if other in literal)
+            for literal in literals
+        }
+    
+    def find(self, text):
+        """
+        Args:
+            text (str): Text to scan
+            
+        Returns:
+            set: Literals that occur in the text as substrings
+        """
+        found = set()
+        if self._scan_re:
+            for literal in self._scan_re.findall(text):
+                found |= self._implied[literal]
+        return found
+
+
+# Service synonym mapping: category keyword -> phrases that indicate it
+SERVICE_SYNONYMS = MappingProxyType({
+    # Social Security Services - FIXED to match actual database service names
+    'appeal': ['appeal', 'appeals', 'decision', 'dispute', 'challenge', 'disputing', 'appealing'],
+    'benefit': ['benefit', 'benefits', 'retirement', 'disability', 'ssi', 'medicare', 'social security', 'apply for benefits'],
+    'apply': ['apply', 'application', 'applications', 'filing', 'apply for'],
+    '1099': ['1099', 'statement', 'statements', 'proof', 'earnings', 'history', 'replacement 1099'],
+    
+    # FIXED: Use keywords that match "Change Address/Direct Deposit"
+    'change': ['change', 'update', 'modify', 'direct deposit', 'change address', 'change direct deposit', 'direct deposit information'],
+    'address': ['address', 'direct deposit', 'change address', 'update address'],
+    'direct': ['direct deposit', 'direct deposit information', 'change direct deposit'],
+    'deposit': ['deposit', 'direct deposit', 'change direct deposit'],
+    
+    'estimate': ['estimate', 'estimates', 'calculator', 'calculation'],
+    'proof': ['proof', 'print proof', 'statements'],
+    'history': ['history', 'earnings', 'review earnings'],
+    'withdrawal': ['withdrawal', 'atm', 'cash'],
+    'transfer': ['transfer', 'funds transfer', 'money transfer'],
+    'international': ['international', 'international transactions', 'overseas'],
+    'overnight': ['overnight', 'express', 'expedited', 'rush', 'overnight delivery'],
+    
+    # Library Technology Services - FIXED WiFi mapping
+    'computer': ['computer', 'computers', 'public computers', 'computer access', 'computer labs', 'computer or internet access'],
+    'wi-fi': ['wifi', 'wi-fi', 'internet', 'wireless'],  # FIXED: Map to 'wi-fi' with hyphen
+    'print': ['print', 'printing', 'printer'],
+    'copy': ['copy', 'copying', 'copies', 'copier'],
+    'scan': ['scan', 'scanning', 'scanner', 'scanners'],
+    
+    # Library Educational Services
+    'class': ['class', 'classes', 'education', 'learning', 'computer class', 'health education', 'sex education', 'parenting education'],
+    'ged': ['ged', 'adult education', 'basic literacy', 'literacy'],
+    'homework': ['homework', 'homework help', 'tutoring', 'study'],
+    'job': ['job', 'job assistance', 'job search', 'job readiness', 'workforce development', 'employment', 'help find work', 'resume development'],
+    'citizenship': ['citizenship', 'citizenship class', 'new americans', 'services for new americans'],
+    
+    # Library Children Services
+    'story': ['story', 'story time', 'story times', 'storytime', 'children'],
+    'after': ['after-school', 'after school', 'kids programs', 'youth programs', 'after school care'],
+    'summer': ['summer', 'summer learning', 'summer programs', 'day camp'],
+    'stem': ['stem', 'science', 'technology', 'engineering', 'math', 'coding', 'programming'],
+    
+    # Library Collections & Research
+    'book': ['book', 'books', 'collection', 'large collection'],
+    'special': ['special', 'special collections', 'research', 'archives'],
+    'foreign': ['foreign', 'chinese', 'spanish', 'language collection', 'multilingual'],
+    'audio': ['audio', 'audiobooks', 'braille', 'large print', 'accessibility'],
+    
+    # Library Events & Programs
+    'event': ['event', 'events', 'author events', 'author talks', 'exhibitions'],
+    'workshop': ['workshop', 'workshops', 'programs', 'community programs'],
+    'tour': ['tour', 'tours', 'guided tours'],
+    'game': ['game', 'games', 'gaming', 'board games', 'chess', 'chess club'],
+    'music': ['music', 'music classes', 'arts'],
+    'cooking': ['cooking', 'cooking classes', 'culinary'],
+    
+    # Library Spaces & Facilities
+    'meeting': ['meeting', 'meeting room', 'meeting rooms', 'meeting spaces', 'conference'],
+    'study': ['study', 'study room', 'study rooms', 'quiet space'],
+    'restroom': ['restroom', 'restrooms', 'bathroom', 'facilities'],
+    'drop': ['book drop', 'return', 'drop box', 'drop off'],
+    
+    # Library Special Services
+    'mail': ['mail', 'delivery', 'postage', 'shipping'],
+    'social': ['social services', 'social support', 'community support'],
+    'health': ['health', 'health classes', 'wellness', 'health education', 'medical care', 'disease screening'],
+    'film': ['film', 'movies', 'foreign film', 'video'],
+
+    # Shelter, Food Bank, Mental Health Services
+    'shelter': ['stay', 'shelter', 'housing', 'safe housing', 'short-term housing', 'residential housing', 'help find housing'],
+    'food': ['food', 'meals', 'meal', 'emergency food', 'food pantry', 'nutrition', 'food delivery'],
+    'mental health': ['mental health', 'mental health care', 'counseling', 'therapy', 'psychiatric', 'support groups', 'peer support', 'bereavement', 'anger management', 'group therapy'],
+    'substance abuse': ['substance abuse', 'addiction', 'recovery', 'sober living', 'detox', '12-step', 'outpatient treatment'],
+    'financial': ['financial', 'financial assistance', 'emergency payments', 'pay for housing', 'pay for utilities', 'government benefits'],
+    'legal': ['legal', 'advocacy & legal aid'],
+    'clothing': ['clothing', 'clothes'],
+    'hygiene': ['hygiene', 'personal care', 'personal hygiene'],
+    'parenting': ['parenting', 'parenting education'],
+    'hotline': ['hotline', 'help hotlines'],
+})
+
+# FIXED: Keyword normalization mappings - normalize TO database format
+KEYWORD_NORMALIZATIONS = MappingProxyType({
+    # WiFi normalization - FIXED: normalize TO wi-fi (database format)
+    'wifi': 'wi-fi',          # FIXED: wifi -> wi-fi
+    'internet': 'wi-fi',      # internet -> wi-fi
+    'wireless': 'wi-fi',      # wireless -> wi-fi
+
+    # Food/Meal normalization - ADD THESE
+    'meal': 'food',         
+    'meals': 'food',
+    'dining': 'food',
+    'lunch': 'food',
+    'dinner': 'food',
+    'breakfast': 'food',
+    
+    # Other normalizations (normalize to singular/database format)
+    'appeals': 'appeal',
+    'benefits': 'benefit',
+    'applications': 'apply',
+    'computers': 'computer',
+    'classes': 'class',
+    'workshops': 'workshop',
+    'programs': 'program',
+    'collections': 'collection',
+    'rooms': 'room',
+    'spaces': 'space',
+    'events': 'event',
+    'services': 'service',
+    'books': 'book',
+    'cards': 'card',
+    'statements': 'statement',
+    'estimates': 'estimate',
+    'housing': 'shelter',
+    'stay': 'shelter',
+    'clothes': 'clothing',
+    
+    # Service variations
+    'printing': 'print',
+    'copying': 'copy',
+    'scanning': 'scan',
+    'tutoring': 'homework help',
+    'employment': 'job assistance',
+    'storytime': 'story time',
+    'after-school': 'after school',
+    'programming': 'coding',
+    'audiobooks': 'audio',
+    'bathroom': 'restroom',
+    'conference': 'meeting room',
+    'quiet space': 'study room',
+    'return': 'book drop',
+    'shipping': 'mail delivery',
+    'wellness': 'health',
+    'movies': 'film',
+    'cash': 'atm',
+    'express': 'overnight',
+    'rush': 'overnight',
+    'addiction': 'substance abuse',
+    'recovery': 'substance abuse',
+    'sober living': 'substance abuse',
+    'detox': 'substance abuse',
+    'therapy': 'mental health',
+    'counseling': 'mental health',
+    
+    # Service action normalization
+    'appealing': 'appeal',
+    'disputing': 'appeal',
+    'challenging': 'appeal',
+    'applying': 'apply',
+    'filing': 'apply',
+    'requesting': 'request',
+    'changing': 'change',
+    'updating': 'change',
+    'calculating': 'estimate',
+    'learning': 'class',
+    'studying': 'study',
+    'gaming': 'game',
+    'teaching': 'class',
+    'training': 'class'
+})
+
+# Semantic service -> organization category mappings, also used when LLM categorization fails
+SERVICE_CATEGORY_KEYWORDS = MappingProxyType({
+    'Food Bank': ['meal', 'meals', 'food', 'dining', 'lunch', 'dinner', 'breakfast', 
+                'emergency food', 'food pantry', 'nutrition'],
+    'Library': ['printer', 'printing', 'print', 'computer', 'computers', 'wifi', 'wi-fi', 
+            'internet', 'copy', 'copying', 'scan', 'scanning', 'book', 'books'],
+    'Social Security Office': ['benefit', 'benefits', 'retirement', 'appeal', 'appeals', 
+                            'card', 'social security', 'disability', 'ssi'],
+    'Mental Health': ['therapy', 'counseling', 'psychiatric', 'mental health', 
+                    'addiction', 'substance abuse', 'recovery'],
+    'Temporary Shelter': ['stay', 'shelter', 'housing', 'emergency housing']
+})
+
+# Services whose category depends on the rest of the query (see the categorization prompt)
+_CONTEXT_DEPENDENT_SERVICES = frozenset({'counseling', 'shelter', 'housing'})
+
+# Services that always belong to one category and need no LLM categorization
+_SERVICE_CATEGORY = MappingProxyType({
+    keyword: category
+    for category, keywords in SERVICE_CATEGORY_KEYWORDS.items()
+    for keyword in keywords
+    if keyword not in _CONTEXT_DEPENDENT_SERVICES
+})
+
+# Lower-cased prefixes that LLMs put before the Cypher query
+_LLM_RESPONSE_PREFIXES = (
+    "here is the cypher query:",
+    "here's the cypher query:",
+    "the cypher query is:",
+    "cypher query:",
+    "query:",
+    "here is the query:",
+    "here's the query:",
+)
+
+_CYPHER_START_KEYWORDS = (
+    'MATCH', 'OPTIONAL', 'WITH', 'CREATE', 'MERGE', 'DELETE', 'DETACH', 'SET', 'REMOVE', 'RETURN', 'CALL', 'USING', 'UNWIND'
+)
+
+# Common service keywords that should be searched directly
+# FIXED: Include 'wi-fi' instead of 'wifi'
+_DIRECT_SERVICE_WORDS = (
+    'wi-fi', 'computer', 'print', 'copy', 'scan', 'class', 'workshop',  # FIXED: wi-fi with hyphen
+    'story time', 'meeting room', 'study room', 'book', 'appeal',
+    'benefit', 'card', 'statement', 'job', 'homework', 'esl',
+    'deposit', 'change', 'direct', 'shelter', 'food', 'mental health', 'substance abuse'
+)
+
+# Direct keywords reported when extracting every requested service for categorization
+_ALL_DIRECT_SERVICE_WORDS = _DIRECT_SERVICE_WORDS + ('counseling', 'therapy', 'pantry', 'meals')
+
+# FIXED: Priority order for the primary service keyword, with wi-fi properly positioned
+_PRIMARY_SERVICE_PRIORITY = (
+    # Social Security specific services (most specific first)
+    'appeal', 'change', 'direct', 'address', '1099', 'card', 'benefit', 'estimate', 'proof', 'history',
+    'withdrawal', 'transfer', 'international', 'overnight',
+
+    # New Categories (High Priority)
+    'hotline', 'shelter', 'food', 'mental health', 'substance abuse', 'financial', 'legal',
+    
+    # Library Technology services - FIXED: wi-fi first
+    'wi-fi', 'computer', 'print', 'copy', 'scan',  # FIXED: wi-fi instead of wifi
+    
+    # Library Education services
+    'esl', 'homework', 'job', 'citizenship', 'class',
+    
+    # Library Children services
+    'story', 'after', 'stem', 'summer',
+    
+    # Library Facilities
+    'meeting', 'study', 'drop',
+    
+    # General services (least specific)
+    'workshop', 'event', 'tour', 'game', 'book', 'parenting', 'clothing', 'hygiene'
+)
+
+
+# Scan each query once for every synonym, direct keyword and normalization key,
+# instead of one substring check per entry
+_SERVICE_SCANNER = _SubstringScanner(
+    [synonym for synonyms in SERVICE_SYNONYMS.values() for synonym in synonyms]
+    + list(_ALL_DIRECT_SERVICE_WORDS)
+)
+_NORMALIZATION_SCANNER = _SubstringScanner(KEYWORD_NORMALIZATIONS)
+# Word-boundary patterns are applied in mapping order, as a later key may match an earlier output
+_NORMALIZATION_PATTERNS = tuple(
+    (original, re.compile(r'\b' + re.escape(original) + r'\b', re.IGNORECASE), normalized)
+    for original, normalized in KEYWORD_NORMALIZATIONS.items()
+)
+
+# Location filters that should not appear in a distance-based spatial query
+_SPATIAL_LOCATION_FILTER_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'tolower\(l\.city\)',
+    r'tolower\(l\.street\)',
+    r'tolower\(l\.zipcode\)',
+    r'tolower\(l\.state\)',
+    r'l\.city\s*contains',
+    r'l\.street\s*contains',
+    r'l\.zipcode\s*=',
+    r'l\.state\s*='
+))
+
+
 class QueryService:
     """
     Enhanced query service with comprehensive token and latency tracking.
@@ -36,180 +605,31 @@ class QueryService:
             temperature=Config.LLM_TEMPERATURE
         )
         
+        # Deterministic LLM for service categorization
+        self.categorization_llm = ChatGroq(
+            model=Config.LLM_MODEL,
+            temperature=0
+        )
+        
         # Initialize prompt templates
         self.spatial_cypher_prompt = PromptTemplateFactory.create_spatial_cypher_prompt()
         self.regular_cypher_prompt = PromptTemplateFactory.create_regular_cypher_prompt()
-        
-        # Initialize LLM chains
-        self.spatial_cypher_chain = self.spatial_cypher_prompt | self.llm
-        self.regular_cypher_chain = self.regular_cypher_prompt | self.llm
+        self.multi_tier_cypher_prompt = PromptTemplateFactory.create_multi_tier_spatial_cypher_prompt()
 
         # REMOVED: Rate limiter initialization
 
-        # Service synonym mapping (unchanged from original)
-        self.service_synonyms = {
-            # Social Security Services - FIXED to match actual database service names
-            'appeal': ['appeal', 'appeals', 'decision', 'dispute', 'challenge', 'disputing', 'appealing'],
-            'benefit': ['benefit', 'benefits', 'retirement', 'disability', 'ssi', 'medicare', 'social security', 'apply for benefits'],
-            'apply': ['apply', 'application', 'applications', 'filing', 'apply for'],
-            '1099': ['1099', 'statement', 'statements', 'proof', 'earnings', 'history', 'replacement 1099'],
-            
-            # FIXED: Use keywords that match "Change Address/Direct Deposit"
-            'change': ['change', 'update', 'modify', 'direct deposit', 'change address', 'change direct deposit', 'direct deposit information'],
-            'address': ['address', 'direct deposit', 'change address', 'update address'],
-            'direct': ['direct deposit', 'direct deposit information', 'change direct deposit'],
-            'deposit': ['deposit', 'direct deposit', 'change direct deposit'],
-            
-            'estimate': ['estimate', 'estimates', 'calculator', 'calculation'],
-            'proof': ['proof', 'print proof', 'statements'],
-            'history': ['history', 'earnings', 'review earnings'],
-            'withdrawal': ['withdrawal', 'atm', 'cash'],
-            'transfer': ['transfer', 'funds transfer', 'money transfer'],
-            'international': ['international', 'international transactions', 'overseas'],
-            'overnight': ['overnight', 'express', 'expedited', 'rush', 'overnight delivery'],
-            
-            # Library Technology Services - FIXED WiFi mapping
-            'computer': ['computer', 'computers', 'public computers', 'computer access', 'computer labs', 'computer or internet access'],
-            'wi-fi': ['wifi', 'wi-fi', 'internet', 'wireless'],  # FIXED: Map to 'wi-fi' with hyphen
-            'print': ['print', 'printing', 'printer'],
-            'copy': ['copy', 'copying', 'copies', 'copier'],
-            'scan': ['scan', 'scanning', 'scanner', 'scanners'],
-            
-            # Library Educational Services
-            'class': ['class', 'classes', 'education', 'learning', 'computer class', 'health education', 'sex education', 'parenting education'],
-            'ged': ['ged', 'adult education', 'basic literacy', 'literacy'],
-            'homework': ['homework', 'homework help', 'tutoring', 'study'],
-            'job': ['job', 'job assistance', 'job search', 'job readiness', 'workforce development', 'employment', 'help find work', 'resume development'],
-            'citizenship': ['citizenship', 'citizenship class', 'new americans', 'services for new americans'],
-            
-            # Library Children Services
-            'story': ['story', 'story time', 'story times', 'storytime', 'children'],
-            'after': ['after-school', 'after school', 'kids programs', 'youth programs', 'after school care'],
-            'summer': ['summer', 'summer learning', 'summer programs', 'day camp'],
-            'stem': ['stem', 'science', 'technology', 'engineering', 'math', 'coding', 'programming'],
-            
-            # Library Collections & Research
-            'book': ['book', 'books', 'collection', 'large collection'],
-            'special': ['special', 'special collections', 'research', 'archives'],
-            'foreign': ['foreign', 'chinese', 'spanish', 'language collection', 'multilingual'],
-            'audio': ['audio', 'audiobooks', 'braille', 'large print', 'accessibility'],
-            
-            # Library Events & Programs
-            'event': ['event', 'events', 'author events', 'author talks', 'exhibitions'],
-            'workshop': ['workshop', 'workshops', 'programs', 'community programs'],
-            'tour': ['tour', 'tours', 'guided tours'],
-            'game': ['game', 'games', 'gaming', 'board games', 'chess', 'chess club'],
-            'music': ['music', 'music classes', 'arts'],
-            'cooking': ['cooking', 'cooking classes', 'culinary'],
-            
-            # Library Spaces & Facilities
-            'meeting': ['meeting', 'meeting room', 'meeting rooms', 'meeting spaces', 'conference'],
-            'study': ['study', 'study room', 'study rooms', 'quiet space'],
-            'restroom': ['restroom', 'restrooms', 'bathroom', 'facilities'],
-            'drop': ['book drop', 'return', 'drop box', 'drop off'],
-            
-            # Library Special Services
-            'mail': ['mail', 'delivery', 'postage', 'shipping'],
-            'social': ['social services', 'social support', 'community support'],
-            'health': ['health', 'health classes', 'wellness', 'health education', 'medical care', 'disease screening'],
-            'film': ['film', 'movies', 'foreign film', 'video'],
-
-            # Shelter, Food Bank, Mental Health Services
-            'shelter': ['stay', 'shelter', 'housing', 'safe housing', 'short-term housing', 'residential housing', 'help find housing'],
-            'food': ['food', 'meals', 'meal', 'emergency food', 'food pantry', 'nutrition', 'food delivery'],
-            'mental health': ['mental health', 'mental health care', 'counseling', 'therapy', 'psychiatric', 'support groups', 'peer support', 'bereavement', 'anger management', 'group therapy'],
-            'substance abuse': ['substance abuse', 'addiction', 'recovery', 'sober living', 'detox', '12-step', 'outpatient treatment'],
-            'financial': ['financial', 'financial assistance', 'emergency payments', 'pay for housing', 'pay for utilities', 'government benefits'],
-            'legal': ['legal', 'advocacy & legal aid'],
-            'clothing': ['clothing', 'clothes'],
-            'hygiene': ['hygiene', 'personal care', 'personal hygiene'],
-            'parenting': ['parenting', 'parenting education'],
-            'hotline': ['hotline', 'help hotlines'],
-        }
-        
-        # FIXED: Keyword normalization mappings - normalize TO database format
-        self.keyword_normalizations = {
-            # WiFi normalization - FIXED: normalize TO wi-fi (database format)
-            'wifi': 'wi-fi',          # FIXED: wifi -> wi-fi
-            'internet': 'wi-fi',      # internet -> wi-fi
-            'wireless': 'wi-fi',      # wireless -> wi-fi
-
-            # Food/Meal normalization - ADD THESE
-            'meal': 'food',         
-            'meals': 'food',
-            'dining': 'food',
-            'lunch': 'food',
-            'dinner': 'food',
-            'breakfast': 'food',
-            
-            # Other normalizations (normalize to singular/database format)
-            'appeals': 'appeal',
-            'benefits': 'benefit',
-            'applications': 'apply',
-            'computers': 'computer',
-            'classes': 'class',
-            'workshops': 'workshop',
-            'programs': 'program',
-            'collections': 'collection',
-            'rooms': 'room',
-            'spaces': 'space',
-            'events': 'event',
-            'services': 'service',
-            'books': 'book',
-            'cards': 'card',
-            'statements': 'statement',
-            'estimates': 'estimate',
-            'meals': 'food',
-            'meal': 'food',
-            'housing': 'shelter',
-            'stay': 'shelter',
-            'clothes': 'clothing',
-            
-            # Service variations
-            'printing': 'print',
-            'copying': 'copy',
-            'scanning': 'scan',
-            'tutoring': 'homework help',
-            'employment': 'job assistance',
-            'storytime': 'story time',
-            'after-school': 'after school',
-            'programming': 'coding',
-            'audiobooks': 'audio',
-            'bathroom': 'restroom',
-            'conference': 'meeting room',
-            'quiet space': 'study room',
-            'return': 'book drop',
-            'shipping': 'mail delivery',
-            'wellness': 'health',
-            'movies': 'film',
-            'cash': 'atm',
-            'express': 'overnight',
-            'rush': 'overnight',
-            'addiction': 'substance abuse',
-            'recovery': 'substance abuse',
-            'sober living': 'substance abuse',
-            'detox': 'substance abuse',
-            'therapy': 'mental health',
-            'counseling': 'mental health',
-            
-            # Service action normalization
-            'appealing': 'appeal',
-            'disputing': 'appeal',
-            'challenging': 'appeal',
-            'applying': 'apply',
-            'filing': 'apply',
-            'requesting': 'request',
-            'changing': 'change',
-            'updating': 'change',
-            'calculating': 'estimate',
-            'learning': 'class',
-            'studying': 'study',
-            'gaming': 'game',
-            'teaching': 'class',
-            'training': 'class'
-        }
+        # Keyword tables are shared, read-only module constants
+        self.service_synonyms = SERVICE_SYNONYMS
+        self.keyword_normalizations = KEYWORD_NORMALIZATIONS
+        self._normalize_service_keywords = functools.lru_cache(
+            maxsize=Config.SERVICE_KEYWORD_CACHE_SIZE
+        )(self._normalize_service_keywords)
+
+        # The schema is identical for every prompt, so read it once, bind it into the
+        # Cypher chains and refresh it periodically
+        self._refresh_schema()
 
-        logging.info("Enhanced QueryService initialized with NO RATE LIMITING for maximum speed")
+        logger.info("Enhanced QueryService initialized with NO RATE LIMITING for maximum speed")
 
     def process_query_with_coordinates(self, user_query, coordinates):
         """
@@ -224,28 +644,32 @@ class QueryService:
             dict: Query processing result
         """
         try:
-            logging.info(f"Processing query with predefined coordinates: {user_query}")
-            logging.info(f"Using coordinates: {coordinates}")
+            logger.info("Processing query with predefined coordinates: %s", user_query)
+            logger.info("Using coordinates: %s", coordinates)
+            
+            # Nearby locations share cache entries and prompts; the raw value is only logged
+            location_text = "user location" if coordinates != _DEFAULT_COORDS else "City Hall (default)"
+            coordinates = _bucket_coordinates(coordinates)
             
             # Step 0: Normalize service keywords and extract service context
-            normalization_start_time = time.time()
+            normalization_start_time = time.perf_counter()
             normalized_query = self._normalize_service_keywords(user_query)
             service_keywords = self._extract_service_keywords(normalized_query)
             primary_service = self._get_primary_service_keyword(normalized_query)
-            normalization_duration = time.time() - normalization_start_time
+            normalization_duration = time.perf_counter() - normalization_start_time
             
             if normalized_query != user_query:
-                logging.info(f"Normalized query: {user_query} -> {normalized_query}")
+                logger.info("Normalized query: %s -> %s", user_query, normalized_query)
             if service_keywords:
-                logging.info(f"Detected service keywords: {service_keywords}")
+                logger.info("Detected service keywords: %s", service_keywords)
             if primary_service:
-                logging.info(f"Primary service keyword: {primary_service}")
+                logger.info("Primary service keyword: %s", primary_service)
             
             # Step 1: Check if we should use memory
-            memory_start_time = time.time()
+            memory_start_time = time.perf_counter()
             use_memory = self.memory.should_use_memory(normalized_query)
-            memory_duration = time.time() - memory_start_time
-            logging.info(f"Memory usage decision: {use_memory}")
+            memory_duration = time.perf_counter() - memory_start_time
+            logger.info("Memory usage decision: %s", use_memory)
             
             # Record memory processing time
             if self.metrics:
@@ -258,26 +682,24 @@ class QueryService:
             if use_memory:
                 processed_query = self.memory.substitute_pronouns(normalized_query)
                 memory_context = self.memory.get_memory_context()
-                logging.info("Using memory context for query processing")
+                logger.info("Using memory context for query processing")
             
             # Step 3: Create spatial context with provided coordinates
             distance_threshold = Config.DEFAULT_DISTANCE_THRESHOLD
-            location_text = "user location" if coordinates != (39.952335, -75.163789) else "City Hall (default)"
             
-            spatial_context = f"""
-USER LOCATION: {coordinates[0]}, {coordinates[1]} ({location_text})
-DISTANCE THRESHOLD: {distance_threshold} miles
-USER COORDINATES: user_latitude = {coordinates[0]}, user_longitude = {coordinates[1]}
-DISTANCE THRESHOLD: distance_threshold = {distance_threshold}
-
-SPATIAL QUERY INSTRUCTIONS:
-- Include distance calculations in your Cypher query using the provided coordinates
-- Filter results ONLY by the distance threshold (distance_miles <= {distance_threshold})
-- DO NOT add location-based filters (street, city, zipcode, state) - distance filtering handles location
-- Sort results by distance (closest first)
-- Include distance_miles in the result set
-- The coordinates represent the {location_text} - use distance, not text matching
-"""
+            # Step 4: Enhance contexts with service intelligence
+            service_context = ""
+            if service_keywords or primary_service:
+                service_context = self._create_service_context(service_keywords, primary_service)
+                memory_context += service_context
+            
+            spatial_context = _SPATIAL_CONTEXT_TEMPLATE.format_map({
+                'lat': coordinates[0],
+                'lon': coordinates[1],
+                'location_text': location_text,
+                'distance_threshold': distance_threshold,
+                'service_context': service_context
+            })
             
             # Create spatial info for memory
             spatial_info = {
@@ -286,60 +708,24 @@ SPATIAL QUERY INSTRUCTIONS:
                 'distance_threshold': distance_threshold
             }
             
-            # Step 4: Enhance contexts with service intelligence
-            if service_keywords or primary_service:
-                service_context = self._create_service_context(service_keywords, primary_service)
-                memory_context += service_context
-                spatial_context += service_context
-            
-            # Step 5: Generate and execute Cypher query with enhanced metrics tracking
-            query_result = self._execute_cypher_query_with_enhanced_metrics(
-                processed_query, True, spatial_context, 
-                memory_context, coordinates, distance_threshold
-            )
-            
-            # Record Neo4j duration to metrics
-            if query_result['success'] and not query_result['results']:
-                # Try expanded radius if no results
-                logging.info("Attempting expanded radius search with predefined coordinates")
-                expanded_result = self._retry_with_expanded_radius_and_enhanced_metrics(
+            # Step 5: Generate and execute Cypher query with enhanced metrics tracking.
+            # Results of fresh (non-memory) queries are reused for a short time.
+            # Identical fresh queries running at the same time share one search.
+            def search():
+                query_result = self._search_with_coordinates(
                     processed_query, spatial_context, memory_context,
-                    coordinates, distance_threshold
+                    coordinates, distance_threshold, spatial_info
                 )
-                
-                # If the expanded search found something, replace the original result
-                if expanded_result['success'] and expanded_result['results']:
-                    spatial_info['distance_threshold'] = expanded_result['distance_threshold']
-                    # Combine metrics from both attempts
-                    original_metrics = self._extract_metrics_from_result(query_result)
-                    expanded_metrics = self._extract_metrics_from_result(expanded_result)
-                    combined_metrics = self._combine_metrics(original_metrics, expanded_metrics)
-                    query_result = expanded_result
-                    query_result['expanded_radius'] = True
-                    query_result.update(combined_metrics)
-                
-                # If expanded search also failed, try finding closest organization
-                elif not expanded_result['results']:
-                    logging.info("Attempting closest organization search with predefined coordinates")
-                    closest_result = self._find_closest_organization_with_enhanced_metrics(
-                        processed_query, spatial_context, memory_context, coordinates
-                    )
-                    
-                    # If closest search found something, replace the result
-                    if closest_result['success'] and closest_result['results']:
-                        spatial_info['distance_threshold'] = None  # No threshold for closest search
-                        # Combine metrics from all three attempts
-                        original_metrics = self._extract_metrics_from_result(query_result)
-                        expanded_metrics = self._extract_metrics_from_result(expanded_result)
-                        closest_metrics = self._extract_metrics_from_result(closest_result)
-                        combined_metrics = self._combine_metrics(
-                            self._combine_metrics(original_metrics, expanded_metrics), 
-                            closest_metrics
-                        )
-                        query_result = closest_result
-                        query_result['expanded_radius'] = True
-                        query_result['closest_search'] = True
-                        query_result.update(combined_metrics)
+                return query_result, spatial_info['distance_threshold']
+            
+            if use_memory:
+                query_result = search()[0]
+            else:
+                query_result, spatial_info['distance_threshold'], shared = _RESULT_CACHE.get_or_search(
+                    _result_cache_key(processed_query, coordinates), search
+                )
+                if shared:
+                    logger.info("Using cached or concurrent query result for repeated query")
 
             # NOW record metrics ONCE with correct expanded status
             if self.metrics and 'neo4j_duration' in query_result:
@@ -356,10 +742,10 @@ SPATIAL QUERY INSTRUCTIONS:
             results = query_result['results']
             if results and not use_memory:
                 self.memory.add_interaction(user_query, results, spatial_info)
-                logging.info(f"Added interaction to memory: {len(results)} results stored")
+                logger.info("Added interaction to memory: %s results stored", len(results))
             elif not results and not use_memory:
                 self.memory.clear_memory()
-                logging.info("Cleared memory due to failed new query")
+                logger.info("Cleared memory due to failed new query")
             
             return {
                 'success': True,
@@ -385,28 +771,220 @@ SPATIAL QUERY INSTRUCTIONS:
             }
             
         except Exception as e:
-            logging.error(f"Query processing with coordinates failed: {str(e)}")
+            logger.error("Query processing with coordinates failed: %s", e)
             return {
-                'success': False,
+                **_FAILED_QUERY_RESULT,
                 'error': str(e),
-                'results': None,
-                'spatial_info': None,
-                'used_memory': False,
-                'expanded_radius': False,
-                'closest_search': False,
                 'is_spatial': True,
                 'token_usage': {},
-                'service_keywords': [],
-                'primary_service': None,
-                # Enhanced metrics (default values)
+                'service_keywords': []
+            }
+
+    def _search_with_coordinates(self, processed_query, spatial_context, memory_context,
+                                 coordinates, distance_threshold, spatial_info):
+        """
+        Generate and run the spatial Cypher query, falling back to an expanded radius
+        and then to the closest organization while nothing is found.
+        
+        With multi-tier generation enabled, all three queries come from a single LLM call.
+        With speculative fallback enabled, the expanded and closest tiers are generated
+        concurrently with the primary query and only used if it comes back empty.
+        
+        Args:
+            processed_query (str): Query after normalization and memory substitution
+            spatial_context (str): Spatial context for the prompt
+            memory_context (str): Memory context for the prompt
+            coordinates (tuple): (latitude, longitude) to search from
+            distance_threshold (float): Initial search radius in miles
+            spatial_info (dict): Updated in place with the threshold actually used
+            
+        Returns:
+            dict: Result of the tier that was used, with metrics of all attempts combined
+        """
+        if Config.MULTI_TIER_CYPHER_GENERATION:
+            query_result = self._search_with_cypher_tiers(
+                processed_query, spatial_context, memory_context,
+                coordinates, distance_threshold, spatial_info
+            )
+            if query_result is not None:
+                return query_result
+        
+        speculative_expanded, speculative_closest = self._submit_speculative_fallbacks(
+            processed_query, spatial_context, memory_context, coordinates, distance_threshold
+        )
+        
+        query_result = self._execute_cypher_query_with_enhanced_metrics(
+            processed_query, True, spatial_context, 
+            memory_context, coordinates, distance_threshold
+        )
+        
+        # Record Neo4j duration to metrics
+        if query_result['success'] and not query_result['results']:
+            # Try expanded radius if no results
+            logger.info("Attempting expanded radius search with predefined coordinates")
+            if speculative_expanded:
+                expanded_result = self._collect_speculative_result(speculative_expanded)
+            else:
+                expanded_result = self._retry_with_expanded_radius_and_enhanced_metrics(
+                    processed_query, spatial_context, memory_context,
+                    coordinates, distance_threshold
+                )
+            
+            # If the expanded search found something, replace the original result
+            if expanded_result['success'] and expanded_result['results']:
+                spatial_info['distance_threshold'] = expanded_result['distance_threshold']
+                # Combine metrics from both attempts
+                original_metrics = self._extract_metrics_from_result(query_result)
+                expanded_metrics = self._extract_metrics_from_result(expanded_result)
+                combined_metrics = self._combine_metrics(original_metrics, expanded_metrics)
+                query_result = expanded_result
+                query_result['expanded_radius'] = True
+                query_result.update(combined_metrics)
+            
+            # If expanded search also failed, try finding closest organization
+            elif not expanded_result['results']:
+                logger.info("Attempting closest organization search with predefined coordinates")
+                if speculative_closest:
+                    closest_result = self._collect_speculative_result(speculative_closest)
+                else:
+                    closest_result = self._find_closest_organization_with_enhanced_metrics(
+                        processed_query, spatial_context, memory_context, coordinates
+                    )
+                
+                # If closest search found something, replace the result
+                if closest_result['success'] and closest_result['results']:
+                    spatial_info['distance_threshold'] = None  # No threshold for closest search
+                    # Combine metrics from all three attempts
+                    original_metrics = self._extract_metrics_from_result(query_result)
+                    expanded_metrics = self._extract_metrics_from_result(expanded_result)
+                    closest_metrics = self._extract_metrics_from_result(closest_result)
+                    combined_metrics = self._combine_metrics(
+                        self._combine_metrics(original_metrics, expanded_metrics), 
+                        closest_metrics
+                    )
+                    query_result = closest_result
+                    query_result['expanded_radius'] = True
+                    query_result['closest_search'] = True
+                    query_result.update(combined_metrics)
+        
+        self._cancel_speculative_fallbacks(speculative_expanded, speculative_closest)
+        return query_result
+
+    def _search_with_cypher_tiers(self, query, spatial_context, memory_context,
+                                  user_coordinates, distance_threshold, spatial_info):
+        """
+        Generate the primary, expanded-radius and closest-organization Cypher queries
+        with one LLM call and run them in that order until one returns results.
+        
+        Args:
+            query (str): Query after normalization and memory substitution
+            spatial_context (str): Spatial context for the prompt
+            memory_context (str): Memory context for the prompt
+            user_coordinates (tuple): (latitude, longitude) to search from
+            distance_threshold (float): Initial search radius in miles
+            spatial_info (dict): Updated in place with the threshold actually used
+            
+        Returns:
+            dict: Query result, or None if the LLM response could not be parsed
+        """
+        expanded_threshold = Config.EXPANDED_DISTANCE_THRESHOLD
+        token_usage = {}
+        try:
+            if self.metrics:
+                self.metrics.start_llm_timing()
+            
+            llm_start_time = time.perf_counter()
+            cypher_response, token_usage, first_token_at = self._invoke_cypher_chain('multi_tier', {
+                "question": query,
+                "spatial_context": spatial_context,
+                "memory_context": memory_context,
+                "user_latitude": user_coordinates[0],
+                "user_longitude": user_coordinates[1],
+                "distance_threshold": distance_threshold,
+                "expanded_threshold": expanded_threshold
+            })
+            llm_duration = time.perf_counter() - llm_start_time
+            first_token_time = first_token_at - llm_start_time
+            generation_time = llm_duration - first_token_time
+            logger.info("Used multi-tier spatial Cypher generation chain")
+            
+            # If the provider reported no token usage, estimate it from the raw JSON response
+            if not token_usage:
+                estimated_input = self._schema_tokens + _estimate_tokens(query + spatial_context + memory_context)
+                estimated_output = _estimate_tokens(cypher_response.content)
+                token_usage = {
+                    'total_tokens': estimated_input + estimated_output,
+                    'input_tokens': estimated_input,
+                    'output_tokens': estimated_output,
+                    'estimated': True
+                }
+                logger.info("Using estimated token usage: %s", token_usage)
+            
+            if self.metrics:
+                self.metrics.record_first_token_time(first_token_at)
+                self.metrics.end_llm_timing()
+                self.metrics.record_enhanced_token_usage(
+                    total_tokens=token_usage['total_tokens'],
+                    input_tokens=token_usage['input_tokens'],
+                    output_tokens=token_usage['output_tokens'],
+                    generation_time=generation_time if generation_time > 0 else None,
+                    time_to_first_token=first_token_time
+                )
+            
+            try:
+                tiers = _parse_cypher_tiers(cypher_response.content)
+            except ValueError as e:
+                logger.warning("Multi-tier Cypher response unusable (%s); generating tiers one at a time", e)
+                return None
+            
+            thresholds = {
+                'primary': distance_threshold,
+                'expanded': expanded_threshold,
+                'closest': None
+            }
+            neo4j_duration = 0.0
+            for tier in _CYPHER_TIERS:
+                cypher_query = self._clean_cypher_response(tiers[tier])
+                logger.info("Generated %s Cypher Query:\n\n%s", tier, cypher_query)
+                self._validate_spatial_cypher(cypher_query)
+                
+                neo4j_start_time = time.perf_counter()
+                results = self.neo4j_client.query(cypher_query)
+                neo4j_duration += time.perf_counter() - neo4j_start_time
+                logger.info("%s tier returned %s results", tier.capitalize(), len(results) if results else 0)
+                
+                if tier == 'primary':
+                    primary_cypher_query = cypher_query
+                if results:
+                    break
+            
+            query_result = {
+                'success': True,
+                'results': results,
+                'cypher_query': cypher_query if results else primary_cypher_query,
+                'token_usage': token_usage,
+                'neo4j_duration': neo4j_duration,
+                'llm_duration': llm_duration,
+                'first_token_time': first_token_time,
+                'generation_time': generation_time
+            }
+            if results and tier != 'primary':
+                spatial_info['distance_threshold'] = thresholds[tier]
+                query_result['distance_threshold'] = thresholds[tier]
+                query_result['expanded_radius'] = True
+                if tier == 'closest':
+                    query_result['closest_search'] = True
+            return query_result
+            
+        except Exception as e:
+            logger.error("Multi-tier Cypher search failed: %s", e)
+            return {
+                'success': False,
+                'error': f"Query execution failed: {str(e)}",
+                'results': None,
+                'token_usage': token_usage,
                 'neo4j_duration': 0.0,
-                'llm_duration': 0.0,
-                'spatial_duration': 0.0,
-                'first_token_time': None,
-                'generation_time': None,
-                'normalization_duration': 0.0,
-                'memory_duration': 0.0,
-                'spatial_detection_duration': 0.0
+                'llm_duration': 0.0
             }
 
     def _execute_cypher_query_with_enhanced_metrics(self, query, is_spatial, spatial_context, memory_context, 
@@ -423,125 +1001,36 @@ SPATIAL QUERY INSTRUCTIONS:
             # REMOVED: Rate limiting call
             
             # Track token generation timing
-            llm_start_time = time.time()
-            first_token_received = False
-            first_token_time = None
+            llm_start_time = time.perf_counter()
             
-            # Method 1: Try with OpenAI callback (works with many providers)
-            token_usage = {}
-            try:
-                with get_openai_callback() as cb:
-                    if is_spatial and user_coordinates:
-                        cypher_response = self.spatial_cypher_chain.invoke({
-                            "schema": self.neo4j_client.get_schema(),
-                            "question": query,
-                            "spatial_context": spatial_context,
-                            "memory_context": memory_context,
-                            "user_latitude": user_coordinates[0],
-                            "user_longitude": user_coordinates[1],
-                            "distance_threshold": distance_threshold
-                        })
-                        logging.info("Used spatial Cypher generation chain")
-                        logging.info(f"Spatial context sent to LLM:\n{spatial_context}")
-                    else:
-                        cypher_response = self.regular_cypher_chain.invoke({
-                            "schema": self.neo4j_client.get_schema(),
-                            "question": query,
-                            "memory_context": memory_context
-                        })
-                        logging.info("Used regular Cypher generation chain")
-                    
-                    # Record first token time (approximate)
-                    if not first_token_received:
-                        first_token_time = time.time() - llm_start_time
-                        first_token_received = True
-                        if self.metrics:
-                            self.metrics.record_first_token_time()
-                    
-                    # Extract token usage from callback
-                    if cb.total_tokens > 0:
-                        token_usage = {
-                            'total_tokens': cb.total_tokens,
-                            'input_tokens': cb.prompt_tokens,
-                            'output_tokens': cb.completion_tokens
-                        }
-                        logging.info(f"Token usage from OpenAI callback: {token_usage}")
-                    
-            except Exception as callback_error:
-                logging.warning(f"OpenAI callback failed: {callback_error}")
-                
-                # Method 2: Direct LLM call to get usage
-                if is_spatial and user_coordinates:
-                    prompt_vars = {
-                        "schema": self.neo4j_client.get_schema(),
-                        "question": query,
-                        "spatial_context": spatial_context,
-                        "memory_context": memory_context,
-                        "user_latitude": user_coordinates[0],
-                        "user_longitude": user_coordinates[1],
-                        "distance_threshold": distance_threshold
-                    }
-                    formatted_prompt = self.spatial_cypher_prompt.format(**prompt_vars)
-                    logging.info("Used spatial Cypher generation chain")
-                    logging.info(f"Spatial context sent to LLM:\n{spatial_context}")
-                else:
-                    prompt_vars = {
-                        "schema": self.neo4j_client.get_schema(),
-                        "question": query,
-                        "memory_context": memory_context
-                    }
-                    formatted_prompt = self.regular_cypher_prompt.format(**prompt_vars)
-                    logging.info("Used regular Cypher generation chain")
-                
-                # Call LLM directly to get raw response
-                try:
-                    raw_response = self.llm.invoke(formatted_prompt)
-                    cypher_response = {'text': raw_response.content}
-                    
-                    # Record first token time (approximate)
-                    if not first_token_received:
-                        first_token_time = time.time() - llm_start_time
-                        first_token_received = True
-                        if self.metrics:
-                            self.metrics.record_first_token_time()
-                    
-                    # Try to extract token usage from raw response
-                    if hasattr(raw_response, 'response_metadata'):
-                        metadata = raw_response.response_metadata
-                        if 'usage' in metadata:
-                            usage = metadata['usage']
-                            token_usage = {
-                                'total_tokens': usage.get('total_tokens', 0),
-                                'input_tokens': usage.get('prompt_tokens', 0),
-                                'output_tokens': usage.get('completion_tokens', 0)
-                            }
-                            logging.info(f"Token usage from raw response metadata: {token_usage}")
-                        elif 'token_usage' in metadata:
-                            usage = metadata['token_usage']
-                            token_usage = {
-                                'total_tokens': usage.get('total_tokens', 0),
-                                'input_tokens': usage.get('prompt_tokens', 0),
-                                'output_tokens': usage.get('completion_tokens', 0)
-                            }
-                            logging.info(f"Token usage from raw response token_usage: {token_usage}")
-                    
-                    # Additional check for usage info in the response object itself
-                    if not token_usage and hasattr(raw_response, 'usage_metadata'):
-                        usage = raw_response.usage_metadata
-                        token_usage = {
-                            'total_tokens': usage.get('total_tokens', 0),
-                            'input_tokens': usage.get('input_tokens', 0),
-                            'output_tokens': usage.get('output_tokens', 0)
-                        }
-                        logging.info(f"Token usage from usage_metadata: {token_usage}")
-                    
-                except Exception as raw_error:
-                    logging.error(f"Raw LLM call failed: {raw_error}")
-                    # Fall back to chain response without token tracking
-                    cypher_response = cypher_response if 'cypher_response' in locals() else {'text': ''}
+            if is_spatial and user_coordinates:
+                cypher_response, token_usage, first_token_at = self._invoke_cypher_chain('spatial', {
+                    "question": query,
+                    "spatial_context": spatial_context,
+                    "memory_context": memory_context,
+                    "user_latitude": user_coordinates[0],
+                    "user_longitude": user_coordinates[1],
+                    "distance_threshold": distance_threshold
+                })
+                logger.info("Used spatial Cypher generation chain")
+                logger.info("Spatial context sent to LLM:\n%s", spatial_context)
+            else:
+                cypher_response, token_usage, first_token_at = self._invoke_cypher_chain('regular', {
+                    "question": query,
+                    "memory_context": memory_context
+                })
+                logger.info("Used regular Cypher generation chain")
+            
+            # Record first token time
+            first_token_time = first_token_at - llm_start_time
+            if self.metrics:
+                self.metrics.record_first_token_time(first_token_at)
+            
+            if token_usage:
+                logger.info("Token usage from response usage_metadata: %s", token_usage)
             
             # End LLM timing
-            llm_end_time = time.time()
+            llm_end_time = time.perf_counter()
             llm_duration = llm_end_time - llm_start_time
             if self.metrics:
                 self.metrics.end_llm_timing()
@@ -549,29 +1038,24 @@ SPATIAL QUERY INSTRUCTIONS:
             # Calculate token generation metrics
             generation_time = llm_duration - (first_token_time or 0)
             
-            # Handle both AIMessage objects and dictionaries
-            if hasattr(cypher_response, 'content'):
-                cypher_query = cypher_response.content
-            else:
-                cypher_query = cypher_response.get('text', '')
+            cypher_query = cypher_response.content
 
             # IMPORTANT: Clean the LLM response to remove explanatory text
             cypher_query = self._clean_cypher_response(cypher_query)
 
-            logging.info(f"Generated Cypher Query:\n\n{cypher_query}")
+            logger.info("Generated Cypher Query:\n\n%s", cypher_query)
             
             # Validate spatial query doesn't contain location filters
             if is_spatial and user_coordinates:
                 self._validate_spatial_cypher(cypher_query)
             
-            # If we still don't have token usage, try to estimate based on text length
-            if not token_usage or token_usage.get('total_tokens', 0) == 0:
-                # Rough estimation: ~4 characters per token for most models
-                input_text = str(self.neo4j_client.get_schema()) + query + spatial_context + memory_context
+            # If the provider reported no token usage, estimate it
+            if not token_usage:
+                input_text = query + spatial_context + memory_context
                 output_text = cypher_query
                 
-                estimated_input = max(1, len(input_text) // 4)
-                estimated_output = max(1, len(output_text) // 4)
+                estimated_input = self._schema_tokens + _estimate_tokens(input_text)
+                estimated_output = _estimate_tokens(output_text)
                 estimated_total = estimated_input + estimated_output
                 
                 token_usage = {
@@ -580,7 +1064,7 @@ SPATIAL QUERY INSTRUCTIONS:
                     'output_tokens': estimated_output,
                     'estimated': True
                 }
-                logging.info(f"Using estimated token usage: {token_usage}")
+                logger.info("Using estimated token usage: %s", token_usage)
             
             # Record enhanced token usage to metrics if available
             if self.metrics and token_usage:
@@ -593,13 +1077,13 @@ SPATIAL QUERY INSTRUCTIONS:
                 )
             
             # Execute Neo4j query with timing
-            neo4j_start_time = time.time()
+            neo4j_start_time = time.perf_counter()
             results = self.neo4j_client.query(cypher_query)
-            neo4j_duration = time.time() - neo4j_start_time
+            neo4j_duration = time.perf_counter() - neo4j_start_time
             
-            logging.info(f"Result from Neo4j Database:\n\n{results}")
-            logging.info(f"Query returned {len(results) if results else 0} results")
-            logging.info(f"Neo4j query execution time: {neo4j_duration:.3f}s")
+            logger.info("Result from Neo4j Database:\n\n%s", results)
+            logger.info("Query returned %s results", len(results) if results else 0)
+            logger.info("Neo4j query execution time: %.3fs", neo4j_duration)
 
             return {
                 'success': True,
@@ -614,7 +1098,7 @@ SPATIAL QUERY INSTRUCTIONS:
             
         except Exception as e:
             # SIMPLIFIED ERROR HANDLING - NO RATE LIMIT RETRIES
-            logging.error(f"Cypher query execution failed: {str(e)}")
+            logger.error("Cypher query execution failed: %s", e)
             return {
                 'success': False,
                 'error': f"Query execution failed: {str(e)}",
@@ -625,13 +1109,17 @@ SPATIAL QUERY INSTRUCTIONS:
             }
 
     def _retry_with_expanded_radius_and_enhanced_metrics(self, query, spatial_context, memory_context, 
-                                                        user_coordinates, original_threshold):
-        """Retry spatial query with expanded radius and comprehensive metrics tracking."""
+                                                        user_coordinates, original_threshold, record_metrics=True):
+        """
+        Retry spatial query with expanded radius and comprehensive metrics tracking.
+        Speculative runs pass record_metrics=False and leave recording to the caller.
+        """
+        metrics = self.metrics if record_metrics else None
         try:
             # REMOVED: Rate limiting call
         
             expanded_threshold = Config.EXPANDED_DISTANCE_THRESHOLD
-            logging.info(f"Retrying spatial query with expanded radius: {expanded_threshold} miles")
+            logger.info("Retrying spatial query with expanded radius: %s miles", expanded_threshold)
             
             # Update spatial context for expanded search
             expanded_spatial_context = spatial_context.replace(
@@ -646,85 +1134,55 @@ SPATIAL QUERY INSTRUCTIONS:
             )
             
             # Record spatial processing time
-            spatial_start_time = time.time()
+            spatial_start_time = time.perf_counter()
             
             # Track LLM timing
-            if self.metrics:
-                self.metrics.start_llm_timing()
+            if metrics:
+                metrics.start_llm_timing()
             
-            llm_start_time = time.time()
+            llm_start_time = time.perf_counter()
             first_token_time = None
             
-            # Try with callback first
-            token_usage = {}
-            try:
-                with get_openai_callback() as cb:
-                    cypher_response = self.spatial_cypher_chain.invoke({
-                        "schema": self.neo4j_client.get_schema(),
-                        "question": query,
-                        "spatial_context": expanded_spatial_context,
-                        "memory_context": memory_context,
-                        "user_latitude": user_coordinates[0],
-                        "user_longitude": user_coordinates[1],
-                        "distance_threshold": expanded_threshold
-                    })
-                    
-                    # Record first token time (approximate)
-                    first_token_time = time.time() - llm_start_time
-                    if self.metrics:
-                        self.metrics.record_first_token_time()
-                    
-                    if cb.total_tokens > 0:
-                        token_usage = {
-                            'total_tokens': cb.total_tokens,
-                            'input_tokens': cb.prompt_tokens,
-                            'output_tokens': cb.completion_tokens
-                        }
-                        logging.info(f"Expanded query token usage: {token_usage}")
-                        
-            except Exception as e:
-                logging.warning(f"Expanded query callback failed: {e}")
-                # Estimate tokens if callback fails
-                input_text = str(self.neo4j_client.get_schema()) + query + expanded_spatial_context + memory_context
-                output_text = cypher_response.get('text', '') if 'cypher_response' in locals() else ''
-                
-                estimated_input = max(1, len(input_text) // 4)
-                estimated_output = max(1, len(output_text) // 4)
-                
-                token_usage = {
-                    'total_tokens': estimated_input + estimated_output,
-                    'input_tokens': estimated_input,
-                    'output_tokens': estimated_output,
-                    'estimated': True
-                }
+            cypher_response, token_usage, first_token_at = self._invoke_cypher_chain('spatial', {
+                "question": query,
+                "spatial_context": expanded_spatial_context,
+                "memory_context": memory_context,
+                "user_latitude": user_coordinates[0],
+                "user_longitude": user_coordinates[1],
+                "distance_threshold": expanded_threshold
+            })
+            
+            # Record first token time
+            first_token_time = first_token_at - llm_start_time
+            if metrics:
+                metrics.record_first_token_time(first_token_at)
+            
+            if token_usage:
+                logger.info("Expanded query token usage: %s", token_usage)
             
             # End LLM timing
-            llm_end_time = time.time()
+            llm_end_time = time.perf_counter()
             llm_duration = llm_end_time - llm_start_time
             generation_time = llm_duration - (first_token_time or 0)
             
-            if self.metrics:
-                self.metrics.end_llm_timing()
+            if metrics:
+                metrics.end_llm_timing()
             
-            # Handle both AIMessage objects and dictionaries
-            if hasattr(cypher_response, 'content'):
-                expanded_cypher_query = cypher_response.content
-            else:
-                expanded_cypher_query = cypher_response.get('text', '')
+            expanded_cypher_query = cypher_response.content
             expanded_cypher_query = self._clean_cypher_response(expanded_cypher_query)
-            logging.info(f"Generated expanded Cypher Query:\n\n{expanded_cypher_query}")
+            logger.info("Generated expanded Cypher Query:\n\n%s", expanded_cypher_query)
             
             # Validate expanded spatial query
             self._validate_spatial_cypher(expanded_cypher_query)
             
             # Record spatial processing time
-            spatial_duration = time.time() - spatial_start_time - llm_duration
-            if self.metrics:
-                self.metrics.record_processing_time('spatial', spatial_duration)
+            spatial_duration = time.perf_counter() - spatial_start_time - llm_duration
+            if metrics:
+                metrics.record_processing_time('spatial', spatial_duration)
             
             # Record enhanced token usage to metrics if available
-            if self.metrics and token_usage:
-                self.metrics.record_enhanced_token_usage(
+            if metrics and token_usage:
+                metrics.record_enhanced_token_usage(
                     total_tokens=token_usage.get('total_tokens', 0),
                     input_tokens=token_usage.get('input_tokens', 0),
                     output_tokens=token_usage.get('output_tokens', 0),
@@ -733,13 +1191,13 @@ SPATIAL QUERY INSTRUCTIONS:
                 )
             
             # Execute expanded query with timing
-            neo4j_start_time = time.time()
+            neo4j_start_time = time.perf_counter()
             expanded_results = self.neo4j_client.query(expanded_cypher_query)
-            neo4j_duration = time.time() - neo4j_start_time
+            neo4j_duration = time.perf_counter() - neo4j_start_time
             
-            logging.info(f"Expanded radius result from Neo4j Database:\n\n{expanded_results}")
-            logging.info(f"Expanded radius result: {len(expanded_results) if expanded_results else 0} results")
-            logging.info(f"Expanded Neo4j query execution time: {neo4j_duration:.3f}s")
+            logger.info("Expanded radius result from Neo4j Database:\n\n%s", expanded_results)
+            logger.info("Expanded radius result: %s results", len(expanded_results) if expanded_results else 0)
+            logger.info("Expanded Neo4j query execution time: %.3fs", neo4j_duration)
 
             return {
                 'success': bool(expanded_results),
@@ -755,7 +1213,7 @@ SPATIAL QUERY INSTRUCTIONS:
             }
             
         except Exception as e:
-            logging.error(f"Expanded query execution failed: {str(e)}")
+            logger.error("Expanded query execution failed: %s", e)
             return {
                 'success': False,
                 'error': f"Expanded query failed: {str(e)}",
@@ -767,12 +1225,16 @@ SPATIAL QUERY INSTRUCTIONS:
             }
     
     def _find_closest_organization_with_enhanced_metrics(self, query, spatial_context, memory_context, 
-                                                        user_coordinates):
-        """Find the closest organization regardless of distance with comprehensive metrics tracking."""
+                                                        user_coordinates, record_metrics=True):
+        """
+        Find the closest organization regardless of distance with comprehensive metrics tracking.
+        Speculative runs pass record_metrics=False and leave recording to the caller.
+        """
+        metrics = self.metrics if record_metrics else None
         try:
             # REMOVED: Rate limiting call
 
-            logging.info("Attempting to find closest organization regardless of distance")
+            logger.info("Attempting to find closest organization regardless of distance")
             
             # Update spatial context for closest search (no distance threshold)
             closest_spatial_context = spatial_context.replace(
@@ -799,71 +1261,41 @@ SPATIAL QUERY INSTRUCTIONS:
             closest_spatial_context += "\n\nSPECIAL INSTRUCTION: Return only the closest organization (LIMIT 5)"
             
             # Record spatial processing time
-            spatial_start_time = time.time()
+            spatial_start_time = time.perf_counter()
             
             # Track LLM timing
-            if self.metrics:
-                self.metrics.start_llm_timing()
+            if metrics:
+                metrics.start_llm_timing()
             
-            llm_start_time = time.time()
+            llm_start_time = time.perf_counter()
             first_token_time = None
             
-            # Try with callback first
-            token_usage = {}
-            try:
-                with get_openai_callback() as cb:
-                    cypher_response = self.spatial_cypher_chain.invoke({
-                        "schema": self.neo4j_client.get_schema(),
-                        "question": query,
-                        "spatial_context": closest_spatial_context,
-                        "memory_context": memory_context,
-                        "user_latitude": user_coordinates[0],
-                        "user_longitude": user_coordinates[1],
-                        "distance_threshold": 999999  # Very large number
-                    })
-                    
-                    # Record first token time (approximate)
-                    first_token_time = time.time() - llm_start_time
-                    if self.metrics:
-                        self.metrics.record_first_token_time()
-                    
-                    if cb.total_tokens > 0:
-                        token_usage = {
-                            'total_tokens': cb.total_tokens,
-                            'input_tokens': cb.prompt_tokens,
-                            'output_tokens': cb.completion_tokens
-                        }
-                        logging.info(f"Closest search token usage: {token_usage}")
-                        
-            except Exception as e:
-                logging.warning(f"Closest search callback failed: {e}")
-                # Estimate tokens if callback fails
-                input_text = str(self.neo4j_client.get_schema()) + query + closest_spatial_context + memory_context
-                output_text = cypher_response.get('text', '') if 'cypher_response' in locals() else ''
-                
-                estimated_input = max(1, len(input_text) // 4)
-                estimated_output = max(1, len(output_text) // 4)
-                
-                token_usage = {
-                    'total_tokens': estimated_input + estimated_output,
-                    'input_tokens': estimated_input,
-                    'output_tokens': estimated_output,
-                    'estimated': True
-                }
+            cypher_response, token_usage, first_token_at = self._invoke_cypher_chain('spatial', {
+                "question": query,
+                "spatial_context": closest_spatial_context,
+                "memory_context": memory_context,
+                "user_latitude": user_coordinates[0],
+                "user_longitude": user_coordinates[1],
+                "distance_threshold": 999999  # Very large number
+            })
+            
+            # Record first token time
+            first_token_time = first_token_at - llm_start_time
+            if metrics:
+                metrics.record_first_token_time(first_token_at)
+            
+            if token_usage:
+                logger.info("Closest search token usage: %s", token_usage)
             
             # End LLM timing
-            llm_end_time = time.time()
+            llm_end_time = time.perf_counter()
             llm_duration = llm_end_time - llm_start_time
             generation_time = llm_duration - (first_token_time or 0)
             
-            if self.metrics:
-                self.metrics.end_llm_timing()
+            if metrics:
+                metrics.end_llm_timing()
             
-            # Handle both AIMessage objects and dictionaries
-            if hasattr(cypher_response, 'content'):
-                closest_cypher_query = cypher_response.content
-            else:
-                closest_cypher_query = cypher_response.get('text', '')
+            closest_cypher_query = cypher_response.content
             closest_cypher_query = self._clean_cypher_response(closest_cypher_query)
             
             # Ensure the query has LIMIT 5 to get only the closest
@@ -877,16 +1309,16 @@ SPATIAL QUERY INSTRUCTIONS:
                 else:
                     closest_cypher_query += '\nLIMIT 5'
             
-            logging.info(f"Generated closest organization Cypher Query:\n\n{closest_cypher_query}")
+            logger.info("Generated closest organization Cypher Query:\n\n%s", closest_cypher_query)
             
             # Record spatial processing time
-            spatial_duration = time.time() - spatial_start_time - llm_duration
-            if self.metrics:
-                self.metrics.record_processing_time('spatial', spatial_duration)
+            spatial_duration = time.perf_counter() - spatial_start_time - llm_duration
+            if metrics:
+                metrics.record_processing_time('spatial', spatial_duration)
             
             # Record enhanced token usage to metrics if available
-            if self.metrics and token_usage:
-                self.metrics.record_enhanced_token_usage(
+            if metrics and token_usage:
+                metrics.record_enhanced_token_usage(
                     total_tokens=token_usage.get('total_tokens', 0),
                     input_tokens=token_usage.get('input_tokens', 0),
                     output_tokens=token_usage.get('output_tokens', 0),
@@ -895,13 +1327,13 @@ SPATIAL QUERY INSTRUCTIONS:
                 )
             
             # Execute closest search query with timing
-            neo4j_start_time = time.time()
+            neo4j_start_time = time.perf_counter()
             closest_results = self.neo4j_client.query(closest_cypher_query)
-            neo4j_duration = time.time() - neo4j_start_time
+            neo4j_duration = time.perf_counter() - neo4j_start_time
             
-            logging.info(f"Closest organization result from Neo4j Database:\n\n{closest_results}")
-            logging.info(f"Closest organization result: {len(closest_results) if closest_results else 0} results")
-            logging.info(f"Closest search Neo4j query execution time: {neo4j_duration:.3f}s")
+            logger.info("Closest organization result from Neo4j Database:\n\n%s", closest_results)
+            logger.info("Closest organization result: %s results", len(closest_results) if closest_results else 0)
+            logger.info("Closest search Neo4j query execution time: %.3fs", neo4j_duration)
 
             return {
                 'success': bool(closest_results),
@@ -918,7 +1350,7 @@ SPATIAL QUERY INSTRUCTIONS:
             }
             
         except Exception as e:
-            logging.error(f"Closest organization search failed: {str(e)}")
+            logger.error("Closest organization search failed: %s", e)
             return {
                 'success': False,
                 'error': f"Closest organization search failed: {str(e)}",
@@ -932,60 +1364,83 @@ SPATIAL QUERY INSTRUCTIONS:
 
     # ALL OTHER METHODS REMAIN UNCHANGED - just remove any rate limiting calls
 
+    def _invoke_cypher_chain(self, prompt_kind, prompt_vars):
+        """
+        Generate a Cypher query and read the token usage the provider reports with it.
+        The response is streamed so the time of the first token is measured, not estimated.
+        
+        Args:
+            prompt_kind (str): 'spatial', 'regular' or 'multi_tier'
+            prompt_vars (dict): Prompt template variables other than the schema
+            
+        Returns:
+            tuple: (LLM response message, token usage dict; empty when none was reported,
+                    time.perf_counter() value when the first token arrived)
+        """
+        if time.monotonic() - self._schema_fetched_at > Config.SCHEMA_CACHE_TTL:
+            self._refresh_schema()
+        
+        response = None
+        first_token_at = None
+        for chunk in self._cypher_chains[prompt_kind].stream(prompt_vars):
+            if response is None:
+                first_token_at = time.perf_counter()
+                response = chunk
+            else:
+                response += chunk
+        if response is None:
+            raise ValueError("LLM returned an empty response")
+        return response, _token_usage_from_response(response), first_token_at
+    
+    def _refresh_schema(self):
+        """
+        Read the graph schema and rebuild the Cypher generation chains with it bound in,
+        so the schema is not passed and re-rendered on every call.
+        """
+        self._schema = self.neo4j_client.get_schema()
+        self._schema_tokens = _estimate_tokens(str(self._schema))
+        self._cypher_chains = {
+            'spatial': self.spatial_cypher_prompt.partial(schema=self._schema) | self.llm,
+            'regular': self.regular_cypher_prompt.partial(schema=self._schema) | self.llm,
+            'multi_tier': self.multi_tier_cypher_prompt.partial(schema=self._schema) | self.llm
+        }
+        self._schema_fetched_at = time.monotonic()
+    
     def _normalize_service_keywords(self, query):
         """Normalize service-related keywords in the query for better matching."""
-        import re
-        
-        query_lower = query.lower()
+        present = _NORMALIZATION_SCANNER.find(query.lower())
         normalized_query = query
         
         # Apply keyword normalizations
-        for original, normalized in self.keyword_normalizations.items():
-            if original in query_lower:
+        for original, pattern, normalized in _NORMALIZATION_PATTERNS:
+            if original in present:
                 # Use word boundaries to avoid partial matches
-                pattern = re.compile(r'\b' + re.escape(original) + r'\b', re.IGNORECASE)
                 normalized_query = pattern.sub(normalized, normalized_query)
         
         if normalized_query != query:
-            logging.info(f"FIXED NORMALIZATION: '{query}' -> '{normalized_query}'")
+            logger.info("FIXED NORMALIZATION: '%s' -> '%s'", query, normalized_query)
         
         return normalized_query
     
     def _extract_service_keywords(self, query):
         """Extract and expand service keywords from query using synonym mapping."""
-        query_lower = query.lower()
-        keywords = []
+        present = _SERVICE_SCANNER.find(query.lower())
         
         # Check each service category
-        for category, synonyms in self.service_synonyms.items():
-            for synonym in synonyms:
-                if synonym in query_lower:
-                    # Add the base category keyword
-                    if category not in keywords:
-                        keywords.append(category)
-                    break
+        keywords = [
+            category for category, synonyms in self.service_synonyms.items()
+            if any(synonym in present for synonym in synonyms)
+        ]
         
         # Also extract direct keywords from normalized query
-        direct_keywords = []
-        
-        # Common service keywords that should be searched directly
         # FIXED: Include 'wi-fi' instead of 'wifi'
-        direct_service_words = [
-            'wi-fi', 'computer', 'print', 'copy', 'scan', 'class', 'workshop',  # FIXED: wi-fi with hyphen
-            'story time', 'meeting room', 'study room', 'book', 'appeal',
-            'benefit', 'card', 'statement', 'job', 'homework', 'esl',
-            'deposit', 'change', 'direct', 'shelter', 'food', 'mental health', 'substance abuse'
-        ]
-        
-        for word in direct_service_words:
-            if word in query_lower:
-                direct_keywords.append(word)
+        direct_keywords = [word for word in _DIRECT_SERVICE_WORDS if word in present]
         
         # Combine and deduplicate
         all_keywords = list(set(keywords + direct_keywords))
         
         if all_keywords:
-            logging.info(f"FIXED: Extracted service keywords: {all_keywords}")
+            logger.info("FIXED: Extracted service keywords: %s", all_keywords)
         
         return all_keywords
     
@@ -996,35 +1451,10 @@ SPATIAL QUERY INSTRUCTIONS:
         if not keywords:
             return None
         
-        # FIXED: Priority order with wi-fi properly positioned
-        priority_order = [
-            # Social Security specific services (most specific first)
-            'appeal', 'change', 'direct', 'address', '1099', 'card', 'benefit', 'estimate', 'proof', 'history',
-            'withdrawal', 'transfer', 'international', 'overnight',
-
-            # New Categories (High Priority)
-            'hotline', 'shelter', 'food', 'mental health', 'substance abuse', 'financial', 'legal',
-            
-            # Library Technology services - FIXED: wi-fi first
-            'wi-fi', 'computer', 'print', 'copy', 'scan',  # FIXED: wi-fi instead of wifi
-            
-            # Library Education services
-            'esl', 'homework', 'job', 'citizenship', 'class',
-            
-            # Library Children services
-            'story', 'after', 'stem', 'summer',
-            
-            # Library Facilities
-            'meeting', 'study', 'drop',
-            
-            # General services (least specific)
-            'workshop', 'event', 'tour', 'game', 'book', 'parenting', 'clothing', 'hygiene'
-        ]
-        
         # Return the highest priority keyword found
-        for priority_keyword in priority_order:
+        for priority_keyword in _PRIMARY_SERVICE_PRIORITY:
             if priority_keyword in keywords:
-                logging.info(f"FIXED: Selected primary service keyword: '{priority_keyword}'")
+                logger.info("FIXED: Selected primary service keyword: '%s'", priority_keyword)
                 return priority_keyword
         
         # If no priority match, return the first keyword
@@ -1041,39 +1471,30 @@ SPATIAL QUERY INSTRUCTIONS:
         Returns:
             list: All detected service keywords
         """
-        query_lower = query.lower()
-        detected_services = []
+        present = _SERVICE_SCANNER.find(query.lower())
         
         # Check each service category
-        for category, synonyms in self.service_synonyms.items():
-            for synonym in synonyms:
-                if synonym in query_lower:
-                    if category not in detected_services:
-                        detected_services.append(category)
-                    break
+        detected_services = [
+            category for category, synonyms in self.service_synonyms.items()
+            if any(synonym in present for synonym in synonyms)
+        ]
         
         # Also extract direct keywords
-        direct_service_words = [
-            'wi-fi', 'computer', 'print', 'copy', 'scan', 'class', 'workshop',
-            'story time', 'meeting room', 'study room', 'book', 'appeal',
-            'benefit', 'card', 'statement', 'job', 'homework', 'esl',
-            'deposit', 'change', 'direct', 'shelter', 'food', 'mental health', 
-            'substance abuse', 'counseling', 'therapy', 'pantry', 'meals'
+        detected_services += [
+            word for word in _ALL_DIRECT_SERVICE_WORDS
+            if word in present and word not in detected_services
         ]
         
-        for word in direct_service_words:
-            if word in query_lower and word not in detected_services:
-                detected_services.append(word)
-        
         if detected_services:
-            logging.info(f"Extracted all service keywords: {detected_services}")
+            logger.info("Extracted all service keywords: %s", detected_services)
         
         return detected_services    
         
     def categorize_services_by_category(self, query):
         """
         Categorize requested services into their organization categories.
-        Uses LLM to intelligently map services to categories based on meaning.
+        Services with a fixed category are looked up directly; the LLM is only asked
+        to map services by meaning when one of them is unknown or context-dependent.
         Returns categories in priority order.
         
         Args:
@@ -1082,8 +1503,6 @@ SPATIAL QUERY INSTRUCTIONS:
         Returns:
             dict: {category_name: [services_for_that_category]}
         """
-        from config import Config
-        
         # Extract all service keywords
         normalized_query = self._normalize_service_keywords(query)
         all_services = self._extract_all_service_keywords(normalized_query)
@@ -1091,7 +1510,33 @@ SPATIAL QUERY INSTRUCTIONS:
         if not all_services:
             return {}
         
-        logging.info(f"Detected services to categorize: {all_services}")
+        logger.info("Detected services to categorize: %s", all_services)
+        
+        # Every service has a fixed category
+        if all(service in _SERVICE_CATEGORY for service in all_services):
+            categorized = {}
+            for service in all_services:
+                categorized.setdefault(_SERVICE_CATEGORY[service], []).append(service)
+            ordered_categories = {
+                category: categorized[category]
+                for category in Config.CATEGORY_ORDER if category in categorized
+            }
+            logger.info("Services categorized by keyword table: %s", ordered_categories)
+            return ordered_categories
+        
+        # The same services have been categorized before; context-dependent
+        # services are categorized from the full query every time
+        cacheable = _CONTEXT_DEPENDENT_SERVICES.isdisjoint(all_services)
+        cache_key = tuple(all_services)
+        cached = None
+        if cacheable:
+            with _CATEGORIZATION_CACHE_LOCK:
+                cached = _CATEGORIZATION_CACHE.get(cache_key)
+                if cached is not None:
+                    _CATEGORIZATION_CACHE.move_to_end(cache_key)
+        if cached is not None:
+            logger.info("Services categorized from cache: %s", cached)
+            return {category: list(services) for category, services in cached.items()}
         
         # Use LLM to categorize services with ENHANCED semantic understanding
         categorization_prompt = f"""
@@ -1168,14 +1613,10 @@ SPATIAL QUERY INSTRUCTIONS:
         
         try:
             # Call LLM for categorization
-            from langchain_groq import ChatGroq
-            llm = ChatGroq(model=Config.LLM_MODEL, temperature=0)
-            
-            response = llm.invoke(categorization_prompt)
+            response = self.categorization_llm.invoke(categorization_prompt)
             response_text = response.content.strip()
             
             # Parse JSON response
-            import json
             # Extract JSON if wrapped in markdown
             if "```json" in response_text:
                 response_text = response_text.split("```json")[1].split("```")[0].strip()
@@ -1190,33 +1631,28 @@ SPATIAL QUERY INSTRUCTIONS:
                 if category in categorized and categorized[category]:
                     ordered_categories[category] = categorized[category]
             
-            logging.info(f"Services categorized by LLM: {ordered_categories}")
+            logger.info("Services categorized by LLM: %s", ordered_categories)
+            
+            if cacheable:
+                with _CATEGORIZATION_CACHE_LOCK:
+                    _CATEGORIZATION_CACHE[cache_key] = {
+                        category: list(services) for category, services in ordered_categories.items()
+                    }
+                    while len(_CATEGORIZATION_CACHE) > Config.CATEGORIZATION_CACHE_SIZE:
+                        _CATEGORIZATION_CACHE.popitem(last=False)
             return ordered_categories
             
         except Exception as e:
-            logging.error(f"LLM categorization failed: {str(e)}")
+            logger.error("LLM categorization failed: %s", e)
             
             # Enhanced fallback with semantic understanding
             categorized = {}
             
-            # Define semantic mappings for fallback
-            semantic_mappings = {
-                'Food Bank': ['meal', 'meals', 'food', 'dining', 'lunch', 'dinner', 'breakfast', 
-                            'emergency food', 'food pantry', 'nutrition'],
-                'Library': ['printer', 'printing', 'print', 'computer', 'computers', 'wifi', 'wi-fi', 
-                        'internet', 'copy', 'copying', 'scan', 'scanning', 'book', 'books'],
-                'Social Security Office': ['benefit', 'benefits', 'retirement', 'appeal', 'appeals', 
-                                        'card', 'social security', 'disability', 'ssi'],
-                'Mental Health': ['therapy', 'counseling', 'psychiatric', 'mental health', 
-                                'addiction', 'substance abuse', 'recovery'],
-                'Temporary Shelter': ['stay', 'shelter', 'housing', 'emergency housing']
-            }
-            
             for service in all_services:
                 service_lower = service.lower()
                 
                 # Check semantic mappings
-                for category, keywords in semantic_mappings.items():
+                for category, keywords in SERVICE_CATEGORY_KEYWORDS.items():
                     if any(keyword in service_lower or service_lower in keyword for keyword in keywords):
                         if category not in categorized:
                             categorized[category] = []
@@ -1230,7 +1666,7 @@ SPATIAL QUERY INSTRUCTIONS:
                 if category in categorized:
                     ordered_categories[category] = categorized[category]
             
-            logging.info(f"Services categorized (enhanced fallback): {ordered_categories}")
+            logger.info("Services categorized (enhanced fallback): %s", ordered_categories)
             return ordered_categories
 
     def _validate_spatial_cypher(self, cypher_query):
@@ -1238,21 +1674,10 @@ SPATIAL QUERY INSTRUCTIONS:
         query_lower = cypher_query.lower()
         
         # Check for problematic location filters
-        problematic_patterns = [
-            r'tolower\(l\.city\)',
-            r'tolower\(l\.street\)',
-            r'tolower\(l\.zipcode\)',
-            r'tolower\(l\.state\)',
-            r'l\.city\s*contains',
-            r'l\.street\s*contains',
-            r'l\.zipcode\s*=',
-            r'l\.state\s*='
-        ]
-        
-        for pattern in problematic_patterns:
-            if re.search(pattern, query_lower):
-                logging.warning(f"SPATIAL QUERY VALIDATION WARNING: Found location filter in spatial query: {pattern}")
-                logging.warning(f"This may cause incorrect results. Spatial queries should only use distance filtering.")
+        for pattern in _SPATIAL_LOCATION_FILTER_PATTERNS:
+            if pattern.search(query_lower):
+                logger.warning("SPATIAL QUERY VALIDATION WARNING: Found location filter in spatial query: %s", pattern.pattern)
+                logger.warning("This may cause incorrect results. Spatial queries should only use distance filtering.")
 
     def _create_service_context(self, service_keywords, primary_service):
         """Create service context to help with Cypher query generation."""
@@ -1293,27 +1718,27 @@ SPATIAL QUERY INSTRUCTIONS:
     def process_query(self, user_query):
         """Process a user query through the complete pipeline with enhanced metrics."""
         try:
-            logging.info(f"Processing query: {user_query}")
+            logger.info("Processing query: %s", user_query)
             
             # Step 0: Normalize service keywords and extract service context
-            normalization_start_time = time.time()
+            normalization_start_time = time.perf_counter()
             normalized_query = self._normalize_service_keywords(user_query)
             service_keywords = self._extract_service_keywords(normalized_query)
             primary_service = self._get_primary_service_keyword(normalized_query)
-            normalization_duration = time.time() - normalization_start_time
+            normalization_duration = time.perf_counter() - normalization_start_time
             
             if normalized_query != user_query:
-                logging.info(f"Normalized query: {user_query} -> {normalized_query}")
+                logger.info("Normalized query: %s -> %s", user_query, normalized_query)
             if service_keywords:
-                logging.info(f"Detected service keywords: {service_keywords}")
+                logger.info("Detected service keywords: %s", service_keywords)
             if primary_service:
-                logging.info(f"Primary service keyword: {primary_service}")
+                logger.info("Primary service keyword: %s", primary_service)
             
             # Step 1: Check if we should use memory
-            memory_start_time = time.time()
+            memory_start_time = time.perf_counter()
             use_memory = self.memory.should_use_memory(normalized_query)
-            memory_duration = time.time() - memory_start_time
-            logging.info(f"Memory usage decision: {use_memory}")
+            memory_duration = time.perf_counter() - memory_start_time
+            logger.info("Memory usage decision: %s", use_memory)
             
             # Record memory processing time
             if self.metrics:
@@ -1326,13 +1751,15 @@ SPATIAL QUERY INSTRUCTIONS:
             if use_memory:
                 processed_query = self.memory.substitute_pronouns(normalized_query)
                 memory_context = self.memory.get_memory_context()
-                logging.info("Using memory context for query processing")
+                logger.info("Using memory context for query processing")
             
             # Step 3: Detect spatial requirements
-            spatial_detection_start_time = time.time()
-            is_spatial_query = self.spatial_intel.detect_spatial_query(processed_query)
-            spatial_detection_duration = time.time() - spatial_detection_start_time
-            logging.info(f"Spatial query detection: {is_spatial_query}")
+            spatial_detection_start_time = time.perf_counter()
+            # Location and distance are parsed in the same pass for spatial queries
+            spatial_analysis = self.spatial_intel.analyze_query(processed_query)
+            is_spatial_query = spatial_analysis.is_spatial
+            spatial_detection_duration = time.perf_counter() - spatial_detection_start_time
+            logger.info("Spatial query detection: %s", is_spatial_query)
             
             # Step 4: Process spatial context if needed
             spatial_context = ""
@@ -1341,14 +1768,14 @@ SPATIAL QUERY INSTRUCTIONS:
             distance_threshold = None
             
             if is_spatial_query:
-                spatial_result = self._process_spatial_query(processed_query)
+                spatial_result = self._process_spatial_query(spatial_analysis)
 
                 if not spatial_result['success']:
                     # If spatial keywords were detected but we couldn't extract a usable location,
                     # treat it as NON-spatial and continue so the user gets "No results found..."
                     err = (spatial_result.get('error') or '').lower()
                     if 'no location extracted' in err:
-                        logging.info(
+                        logger.info(
                             "Spatial keywords detected but no location extracted; falling back to non-spatial flow"
                         )
                         is_spatial_query = False
@@ -1371,7 +1798,15 @@ SPATIAL QUERY INSTRUCTIONS:
                 memory_context += service_context
                 spatial_context += service_context
             
-            # Step 6: Generate and execute Cypher query with enhanced metrics tracking
+            # Step 6: Generate and execute Cypher query with enhanced metrics tracking.
+            # Fallback tiers may be generated alongside it (see _search_with_coordinates).
+            speculative_expanded = speculative_closest = None
+            if is_spatial_query and distance_threshold < Config.EXPANDED_DISTANCE_THRESHOLD:
+                speculative_expanded, speculative_closest = self._submit_speculative_fallbacks(
+                    processed_query, spatial_context, memory_context,
+                    user_coordinates, distance_threshold
+                )
+            
             query_result = self._execute_cypher_query_with_enhanced_metrics(
                 processed_query, is_spatial_query, spatial_context, 
                 memory_context, user_coordinates, distance_threshold
@@ -1391,11 +1826,14 @@ SPATIAL QUERY INSTRUCTIONS:
             if query_result['success'] and not query_result['results']:
                 # Try expanded radius for spatial queries if no results
                 if is_spatial_query and distance_threshold < Config.EXPANDED_DISTANCE_THRESHOLD:
-                    logging.info("Attempting expanded radius search")
-                    expanded_result = self._retry_with_expanded_radius_and_enhanced_metrics(
-                        processed_query, spatial_context, memory_context,
-                        user_coordinates, distance_threshold
-                    )
+                    logger.info("Attempting expanded radius search")
+                    if speculative_expanded:
+                        expanded_result = self._collect_speculative_result(speculative_expanded)
+                    else:
+                        expanded_result = self._retry_with_expanded_radius_and_enhanced_metrics(
+                            processed_query, spatial_context, memory_context,
+                            user_coordinates, distance_threshold
+                        )
                     
                     # If the expanded search found something, replace the original result
                     if expanded_result['success'] and expanded_result['results']:
@@ -1411,10 +1849,13 @@ SPATIAL QUERY INSTRUCTIONS:
                     
                     # If expanded search also failed, try finding closest organization
                     elif not expanded_result['results'] and is_spatial_query:
-                        logging.info("Attempting closest organization search")
-                        closest_result = self._find_closest_organization_with_enhanced_metrics(
-                            processed_query, spatial_context, memory_context, user_coordinates
-                        )
+                        logger.info("Attempting closest organization search")
+                        if speculative_closest:
+                            closest_result = self._collect_speculative_result(speculative_closest)
+                        else:
+                            closest_result = self._find_closest_organization_with_enhanced_metrics(
+                                processed_query, spatial_context, memory_context, user_coordinates
+                            )
                         
                         # If closest search found something, replace the result
                         if closest_result['success'] and closest_result['results']:
@@ -1433,14 +1874,16 @@ SPATIAL QUERY INSTRUCTIONS:
                             query_result['closest_search'] = True
                             query_result.update(combined_metrics)
             
+            self._cancel_speculative_fallbacks(speculative_expanded, speculative_closest)
+            
             # Step 7: Update memory if we got results
             results = query_result['results']
             if results and not use_memory:
                 self.memory.add_interaction(user_query, results, spatial_info)
-                logging.info(f"Added interaction to memory: {len(results)} results stored")
+                logger.info("Added interaction to memory: %s results stored", len(results))
             elif not results and not use_memory:
                 self.memory.clear_memory()
-                logging.info("Cleared memory due to failed new query")
+                logger.info("Cleared memory due to failed new query")
             
             return {
                 'success': True,
@@ -1466,30 +1909,72 @@ SPATIAL QUERY INSTRUCTIONS:
             }
             
         except Exception as e:
-            logging.error(f"Query processing failed: {str(e)}")
+            logger.error("Query processing failed: %s", e)
             return {
-                'success': False,
+                **_FAILED_QUERY_RESULT,
                 'error': str(e),
-                'results': None,
-                'spatial_info': None,
-                'used_memory': False,
-                'expanded_radius': False,
-                'closest_search': False,
                 'is_spatial': False,
                 'token_usage': {},
-                'service_keywords': [],
-                'primary_service': None,
-                # Enhanced metrics (default values)
-                'neo4j_duration': 0.0,
-                'llm_duration': 0.0,
-                'spatial_duration': 0.0,
-                'first_token_time': None,
-                'generation_time': None,
-                'normalization_duration': 0.0,
-                'memory_duration': 0.0,
-                'spatial_detection_duration': 0.0
+                'service_keywords': []
             }
     
+    def _submit_speculative_fallbacks(self, query, spatial_context, memory_context,
+                                      user_coordinates, distance_threshold):
+        """
+        Start generating the expanded-radius and closest-organization tiers in the background
+        when Config.SPECULATIVE_FALLBACK_SEARCH is enabled.
+        
+        Returns:
+            tuple: (expanded Future, closest Future), or (None, None) when disabled
+        """
+        if not Config.SPECULATIVE_FALLBACK_SEARCH:
+            return None, None
+        speculative_expanded = _FALLBACK_EXECUTOR.submit(
+            self._retry_with_expanded_radius_and_enhanced_metrics,
+            query, spatial_context, memory_context,
+            user_coordinates, distance_threshold, False
+        )
+        speculative_closest = _FALLBACK_EXECUTOR.submit(
+            self._find_closest_organization_with_enhanced_metrics,
+            query, spatial_context, memory_context, user_coordinates, False
+        )
+        return speculative_expanded, speculative_closest
+    
+    @staticmethod
+    def _cancel_speculative_fallbacks(*futures):
+        """Drop speculative tiers that were not needed; ones already running finish unobserved."""
+        for future in futures:
+            if future:
+                future.cancel()
+    
+    def _collect_speculative_result(self, future):
+        """
+        Wait for a speculative fallback tier and record the metrics it skipped.
+        
+        Args:
+            future (Future): Fallback tier submitted with record_metrics=False
+            
+        Returns:
+            dict: The tier's query result
+        """
+        result = future.result()
+        
+        if self.metrics:
+            if 'spatial_duration' in result:
+                self.metrics.record_processing_time('spatial', result['spatial_duration'])
+            token_usage = result.get('token_usage')
+            if token_usage:
+                generation_time = result.get('generation_time')
+                self.metrics.record_enhanced_token_usage(
+                    total_tokens=token_usage.get('total_tokens', 0),
+                    input_tokens=token_usage.get('input_tokens', 0),
+                    output_tokens=token_usage.get('output_tokens', 0),
+                    generation_time=generation_time if generation_time and generation_time > 0 else None,
+                    time_to_first_token=result.get('first_token_time')
+                )
+        
+        return result
+    
     def _extract_metrics_from_result(self, result):
         """Extract metrics from a query result for combining."""
         return {
@@ -1517,13 +2002,13 @@ SPATIAL QUERY INSTRUCTIONS:
             'generation_time': (metrics1.get('generation_time') or 0.0) + (metrics2.get('generation_time') or 0.0)
         }
     
-    def _process_spatial_query(self, query):
-        """Process spatial aspects of a query with timing."""
+    def _process_spatial_query(self, spatial_analysis):
+        """Process spatial aspects of a query with timing, given its SpatialAnalysis."""
         try:
-            spatial_start_time = time.time()
+            spatial_start_time = time.perf_counter()
             
-            # Extract location from query
-            location_text = self.spatial_intel.extract_location_from_query(query)
+            # Location extracted from query
+            location_text = spatial_analysis.location
             
             if not location_text:
                 return {
@@ -1532,9 +2017,9 @@ SPATIAL QUERY INSTRUCTIONS:
                 }
             
             # Geocode location with timing
-            geocoding_start_time = time.time()
+            geocoding_start_time = time.perf_counter()
             user_coordinates = self.spatial_intel.geocode_location(location_text)
-            geocoding_duration = time.time() - geocoding_start_time
+            geocoding_duration = time.perf_counter() - geocoding_start_time
             
             if not user_coordinates:
                 # Record failed geocoding
@@ -1549,8 +2034,8 @@ SPATIAL QUERY INSTRUCTIONS:
             if self.metrics:
                 self.metrics.record_geocoding(True, location_text, geocoding_duration)
             
-            # Get distance threshold
-            distance_threshold = self.spatial_intel.get_distance_threshold(query)
+            # Distance threshold from query
+            distance_threshold = spatial_analysis.distance_threshold
             
             # Create spatial context with clear instructions
             spatial_context = self.spatial_intel.create_spatial_context(
@@ -1563,12 +2048,12 @@ SPATIAL QUERY INSTRUCTIONS:
             )
             
             # Record total spatial processing time
-            total_spatial_duration = time.time() - spatial_start_time
+            total_spatial_duration = time.perf_counter() - spatial_start_time
             if self.metrics:
                 self.metrics.record_processing_time('spatial', total_spatial_duration)
             
-            logging.info(f"Spatial processing successful: {location_text} -> {user_coordinates}, threshold: {distance_threshold}")
-            logging.info(f"Spatial processing time: {total_spatial_duration:.3f}s (geocoding: {geocoding_duration:.3f}s)")
+            logger.info("Spatial processing successful: %s -> %s, threshold: %s", location_text, user_coordinates, distance_threshold)
+            logger.info("Spatial processing time: %.3fs (geocoding: %.3fs)", total_spatial_duration, geocoding_duration)
             
             return {
                 'success': True,
@@ -1582,7 +2067,7 @@ SPATIAL QUERY INSTRUCTIONS:
             }
             
         except Exception as e:
-            logging.error(f"Spatial processing failed: {str(e)}")
+            logger.error("Spatial processing failed: %s", e)
             return {
                 'success': False,
                 'error': f"Spatial processing error: {str(e)}"
@@ -1640,18 +2125,9 @@ SPATIAL QUERY INSTRUCTIONS:
         cypher_text = cypher_response_text.strip()
         
         # Remove common prefixes that LLMs add
-        prefixes_to_remove = [
-            "Here is the Cypher query:",
-            "Here's the Cypher query:",
-            "The Cypher query is:",
-            "Cypher query:",
-            "Query:",
-            "Here is the query:",
-            "Here's the query:",
-        ]
-        
-        for prefix in prefixes_to_remove:
-            if cypher_text.lower().startswith(prefix.lower()):
+        cypher_text_lower = cypher_text.lower()
+        for prefix in _LLM_RESPONSE_PREFIXES:
+            if cypher_text_lower.startswith(prefix):
                 cypher_text = cypher_text[len(prefix):].strip()
                 break
         
@@ -1684,13 +2160,11 @@ SPATIAL QUERY INSTRUCTIONS:
         
         # Additional cleanup: remove any non-Cypher explanatory text at the beginning
         lines = cypher_text.split('\n')
-        cypher_start_keywords = ['MATCH', 'OPTIONAL', 'WITH', 'CREATE', 'MERGE', 'DELETE', 'DETACH', 'SET', 'REMOVE', 'RETURN', 'CALL', 'USING', 'UNWIND']
         
         # Find the first line that starts with a Cypher keyword
         start_index = 0
         for i, line in enumerate(lines):
-            line_trimmed = line.strip().upper()
-            if any(line_trimmed.startswith(keyword) for keyword in cypher_start_keywords):
+            if line.strip().upper().startswith(_CYPHER_START_KEYWORDS):
                 start_index = i
                 break
         
@@ -1701,7 +2175,7 @@ SPATIAL QUERY INSTRUCTIONS:
         # Final cleanup
         cypher_text = cypher_text.strip()
         
-        logging.info(f"Cleaned Cypher query from LLM response. Original length: {len(cypher_response_text)}, Cleaned length: {len(cypher_text)}")
-        logging.info(f"Curly brace conversion applied for Neo4j compatibility")
+        logger.info("Cleaned Cypher query from LLM response. Original length: %s, Cleaned length: %s", len(cypher_response_text), len(cypher_text))
+        logger.info("Curly brace conversion applied for Neo4j compatibility")
         
         return cypher_text
\ No newline at end of file
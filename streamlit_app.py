@@ -436,9 +436,9 @@ class OrganizationInfoApp:
         
         # Record memory usage with timing
         import time
-        memory_start_time = time.time()
+        memory_start_time = time.perf_counter()
         is_focused = self.query_service.is_focused_followup(user_query)
-        memory_duration = time.time() - memory_start_time
+        memory_duration = time.perf_counter() - memory_start_time
         
         self.metrics.record_memory_usage(
             used_memory=True,
@@ -573,6 +573,8 @@ class OrganizationInfoApp:
         try:
             # Log session to Google Sheets before cleanup - NEW
             self.log_session_to_sheets()
+            if self.sheets_logger:
+                self.sheets_logger.flush()
             
             if hasattr(self, 'neo4j_client'):
                 self.neo4j_client.close()
@@ -1143,12 +1145,10 @@ def extract_user_location_from_query(query, raw_data, app_instance=None):
     """
     # Use the app's spatial intelligence if available
     if app_instance and hasattr(app_instance, 'spatial_intel'):
-        # Check if it's a spatial query first
-        if app_instance.spatial_intel.detect_spatial_query(query):
-            # Extract location using the existing spatial intelligence
-            location_text = app_instance.spatial_intel.extract_location_from_query(query)
-            if location_text:
-                return location_text
+        # Check if it's a spatial query first; the location is extracted in the same pass
+        spatial_analysis = app_instance.spatial_intel.analyze_query(query)
+        if spatial_analysis.location:
+            return spatial_analysis.location
     
     # Fallback: try to get from raw_data if spatial processing already happened
     if raw_data:
@@ -371,6 +371,25 @@ CRITICAL OUTPUT RULES:
 Question: {question}
 """
 
+# Same instructions as the spatial template, but asking for all three search tiers at once
+MULTI_TIER_SPATIAL_CYPHER_TEMPLATE = SPATIAL_CYPHER_GENERATION_TEMPLATE.replace(
+    "CRITICAL OUTPUT RULE: Generate ONLY the executable Cypher query. Do NOT include any explanatory text, introductions, markdown formatting, or code blocks. Start directly with MATCH, OPTIONAL MATCH, or WITH.",
+    "CRITICAL OUTPUT RULE: Generate ONLY the JSON object described in the MULTI-TIER OUTPUT RULES. Do NOT include any explanatory text, introductions, markdown formatting, or code blocks."
+).replace(
+    "Question: {question}\n",
+    """MULTI-TIER OUTPUT RULES (these replace rules 33-36):
+41. Write three versions of the Cypher query for the same question, identical except for the distance filter:
+    - "primary": filter with distance_miles <= {distance_threshold}
+    - "expanded": filter with distance_miles <= {expanded_threshold}
+    - "closest": no distance filter, ending with ORDER BY distance_miles ASC LIMIT 5
+42. Return ONLY a JSON object with exactly these keys and each query as a string value:
+    {{"primary": "...", "expanded": "...", "closest": "..."}}
+43. Do NOT include any text before or after the JSON object.
+
+Question: {question}
+"""
+)
+
 CYPHER_GENERATION_TEMPLATE = """
 You are an expert Neo4j Cypher translator who converts English questions to Cypher queries with conversational memory.
 
@@ -809,6 +828,15 @@ class PromptTemplateFactory:
             template=SPATIAL_CYPHER_GENERATION_TEMPLATE
         )
     
+    @staticmethod
+    def create_multi_tier_spatial_cypher_prompt():
+        """Create spatial Cypher prompt template that generates all three search tiers."""
+        return PromptTemplate(
+            input_variables=["schema", "question", "spatial_context", "memory_context", 
+                           "user_latitude", "user_longitude", "distance_threshold", "expanded_threshold"],
+            template=MULTI_TIER_SPATIAL_CYPHER_TEMPLATE
+        )
+    
     @staticmethod
     def create_regular_cypher_prompt():
         """Create regular Cypher generation prompt template."""